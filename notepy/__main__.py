@@ -1,9 +1,20 @@
+from functools import lru_cache
+
 from notepy.cli.cli import Cli
 from notepy.cli.cli_config import _COMMANDS
 
 
+@lru_cache(maxsize=1)
+def _build_cli() -> Cli:
+    """
+    Build the command line interface once and reuse it
+    on every subsequent invocation in the same process.
+    """
+    return Cli(prog="notepy", description="Zettelkasten manager", **_COMMANDS)
+
+
 def run() -> None:
-    cli = Cli(prog="notepy", description="Zettelkasten manager", **_COMMANDS)
+    cli = _build_cli()
     cli.run()
 
 
@@ -1,19 +1,21 @@
 from __future__ import annotations
-from typing import Any
-from collections.abc import MutableMapping
-
-from dataclasses import dataclass, fields
+import sys
+from contextlib import suppress
+from io import StringIO
+from typing import Any, ClassVar
+from collections.abc import MutableMapping, Callable
+
+from dataclasses import dataclass, field, fields
+from functools import cache, wraps
 from argparse import ArgumentParser, Namespace
+from types import ModuleType
+from typing import TYPE_CHECKING
 
-from notepy.zettelkasten.zettelkasten import Zettelkasten
-from notepy.zettelkasten import zettelkasten as zk
-from notepy.zettelkasten.notes import NoteException
-from notepy.wrappers.base_wrapper import WrapperException
-from notepy.wrappers.editor_wrapper import EditorException
 from notepy.utils import spinner, ask_for_confirmation
-from notepy.zettelkasten.sql import DBManagerException
-from notepy.cli.colors import color
-from notepy.cli.interactive_selection import Interactive
+from notepy.cli.colors import _FG, _RESET
+
+if TYPE_CHECKING:
+    from notepy.zettelkasten.zettelkasten import Zettelkasten
 
 
 _COLORS = {
@@ -27,17 +29,89 @@ _COLORS = {
 }
 
 
+# the zettelkasten stack (sqlite, git and editor wrappers, curses)
+# is imported only when a subcommand actually needs it, so that
+# `--help` and argument errors do not pay for it.
+@cache
+def _zk_module() -> ModuleType:
+    """
+    Import the zettelkasten module on first use.
+
+    :return: the `notepy.zettelkasten.zettelkasten` module.
+    """
+    from notepy.zettelkasten import zettelkasten
+
+    return zettelkasten
+
+
+# exceptions that subcommands report to the user instead of
+# propagating, resolved on first use like `_zk_module`. EditorException
+# is a WrapperException and TitleClashError a ZettelkastenException.
+@cache
+def _note_errors() -> tuple[type[Exception], ...]:
+    """
+    Errors reported by the subcommands that read or write notes.
+    """
+    from notepy.zettelkasten.notes import NoteException
+
+    return _editor_errors() + (NoteException,)
+
+
+@cache
+def _editor_errors() -> tuple[type[Exception], ...]:
+    """
+    Errors reported by the subcommands that only open notes.
+    """
+    from notepy.wrappers.base_wrapper import WrapperException
+
+    return (_zk_module().ZettelkastenException, WrapperException)
+
+
+@cache
+def _index_errors() -> tuple[type[Exception], ...]:
+    """
+    Errors reported by the subcommands that query the index.
+    """
+    from notepy.zettelkasten.sql import DBManagerException
+
+    return (_zk_module().ZettelkastenException, DBManagerException)
+
+
+def _report_errors(handled_errors: Callable[[], tuple[type[Exception], ...]]
+                   ) -> Callable[[Callable[[Namespace], None]], Callable[[Namespace], None]]:
+    """
+    Print the handled errors raised by a subcommand.
+
+    :param handled_errors: function returning the errors to report.
+    """
+    def decorator(func: Callable[[Namespace], None]) -> Callable[[Namespace], None]:
+        @wraps(func)
+        def wrapper(args: Namespace) -> None:
+            try:
+                func(args)
+            except handled_errors() as e:
+                print(e)
+
+        return wrapper
+
+    return decorator
+
+
 class SubcommandsMixin:
+    __slots__ = ()
+    _HANDLERS: ClassVar[dict[str, Callable[[Namespace], None]]]
+
     @staticmethod
     def initialize(args: Namespace) -> None:
+        zk = _zk_module()
         try:
-            my_zk = Zettelkasten.initialize(args.vault,
-                                            args.author[0],
-                                            args.git_init,
-                                            args.git_origin[0],
-                                            autocommit=args.autocommit,
-                                            autosync=args.autosync,
-                                            force=args.force)
+            my_zk = zk.Zettelkasten.initialize(args.vault,
+                                               args.author[0],
+                                               args.git_init,
+                                               args.git_origin[0],
+                                               autocommit=args.autocommit,
+                                               autosync=args.autosync,
+                                               force=args.force)
             print(f"Vault initialized in '{args.vault}'")
             del my_zk
         except zk.ZettelkastenException:
@@ -45,64 +119,40 @@ class SubcommandsMixin:
                   f"`--force` to force re-initialization.")
 
     @staticmethod
+    @_report_errors(_note_errors)
     def new(args: Namespace) -> None:
-        try:
-            my_zk = SubcommandsMixin._create_zettelkasten(args)
-            my_zk.new(args.title[0],
-                      author=args.author[0],
-                      confirmation=args.no_confirmation,
-                      strict=args.strict)
-        except zk.TitleClashError as e:
-            print(e)
-        except zk.ZettelkastenException as e:
-            print(e)
-        except WrapperException as e:
-            print(e)
-        except EditorException as e:
-            print(e)
-        except NoteException as e:
-            print(e)
+        my_zk = SubcommandsMixin._create_zettelkasten(args)
+        my_zk.new(args.title[0],
+                  author=args.author[0],
+                  confirmation=args.no_confirmation,
+                  strict=args.strict)
 
     @staticmethod
+    @_report_errors(_note_errors)
     def edit(args: Namespace) -> None:
-        try:
-            my_zk = SubcommandsMixin._create_zettelkasten(args)
-            zk_id = SubcommandsMixin._get_zk_id(args, my_zk)
-            if zk_id is None:
-                return
-            my_zk.update(zk_id,
-                         confirmation=args.no_confirmation,
-                         strict=args.strict)
-        except zk.ZettelkastenException as e:
-            print(e)
-        except WrapperException as e:
-            print(e)
-        except EditorException as e:
-            print(e)
-        except NoteException as e:
-            print(e)
+        my_zk = SubcommandsMixin._create_zettelkasten(args)
+        zk_id = SubcommandsMixin._get_zk_id(args, my_zk)
+        if zk_id is None:
+            return
+        my_zk.update(zk_id,
+                     confirmation=args.no_confirmation,
+                     strict=args.strict)
 
     @staticmethod
+    @_report_errors(_editor_errors)
     def open(args: Namespace) -> None:
-        try:
-            my_zk = SubcommandsMixin._create_zettelkasten(args)
-            if len(args.zk_id) <= 1:
-                zk_id = SubcommandsMixin._get_zk_id(args, my_zk)
-                if zk_id is None:
-                    return
-                else:
-                    zk_id = [zk_id]
+        my_zk = SubcommandsMixin._create_zettelkasten(args)
+        if len(args.zk_id) <= 1:
+            zk_id = SubcommandsMixin._get_zk_id(args, my_zk)
+            if zk_id is None:
+                return
             else:
-                zk_id = [my_zk.get_last()
-                         if zk_id == -1
-                         else zk_id for zk_id in args.zk_id]
-            my_zk.open(zk_id)
-        except zk.ZettelkastenException as e:
-            print(e)
-        except WrapperException as e:
-            print(e)
-        except EditorException as e:
-            print(e)
+                zk_id = [zk_id]
+        else:
+            zk_id = [my_zk.get_last()
+                     if zk_id == -1
+                     else zk_id for zk_id in args.zk_id]
+        my_zk.open(zk_id)
 
     @staticmethod
     def delete(args: Namespace) -> None:
@@ -140,44 +190,57 @@ class SubcommandsMixin:
         print(my_zk.print_note(zk_id))
 
     @staticmethod
+    @_report_errors(_index_errors)
     def list(args: Namespace) -> None:
-        try:
-            my_zk = SubcommandsMixin._create_zettelkasten(args)
-            results = my_zk.list_notes(args.title,
-                                       args.id,
-                                       args.author_name,
-                                       args.tags,
-                                       args.links,
-                                       # args.creation_date,
-                                       # args.access_date,
-                                       args.sort_by[0],
-                                       args.descending,
-                                       args.show)
-            SubcommandsMixin._pretty_print(args.show,
-                                           results,
-                                           no_header=args.no_header,
-                                           no_color=args.no_color)
-        except zk.ZettelkastenException as e:
-            print(e)
-        except DBManagerException as e:
-            print(e)
+        my_zk = SubcommandsMixin._create_zettelkasten(args)
+        results = my_zk.list_notes(args.title,
+                                   args.id,
+                                   args.author_name,
+                                   args.tags,
+                                   args.links,
+                                   # args.creation_date,
+                                   # args.access_date,
+                                   args.sort_by[0],
+                                   args.descending,
+                                   args.show)
+        SubcommandsMixin._pretty_print(args.show,
+                                       results,
+                                       no_header=args.no_header,
+                                       no_color=args.no_color)
 
     @staticmethod
     def _pretty_print(header_names: list[str],
                       results: list[tuple[str]],
                       no_header: bool = False,
                       no_color: bool = False) -> None:
-        if not no_header:
-            print()
-            header_length = len(", ".join(header_names))
-            header = ", ".join([color(col, _COLORS.get(col, "WHITE"),
-                                      no_color=no_color) for col in header_names])
-            print(header)
-            print("-"*header_length)
-        for res in results:
-            text = ", ".join([color(col, _COLORS.get(header_names[index], "WHITE"),
-                             no_color=no_color) for index, col in enumerate(res)])
-            print(text)
+        # build the whole output and write it at once
+        output = StringIO()
+        if no_color:
+            if not no_header:
+                header = ", ".join(header_names)
+                output.write(f"\n{header}\n{'-'*len(header)}\n")
+            for res in results:
+                output.write(", ".join(map(str, res)))
+                output.write("\n")
+        else:
+            # resolve the color code of each column only once,
+            # aligned with the columns of the results
+            codes = tuple(_FG[_COLORS.get(col, "WHITE")]
+                          for col in header_names)
+            reset = _RESET
+            if not no_header:
+                header_length = len(", ".join(header_names))
+                header = ", ".join([f"{code}{col}{reset}"
+                                    for code, col in zip(codes, header_names)])
+                output.write(f"\n{header}\n{'-'*header_length}\n")
+            for res in results:
+                output.write(", ".join([f"{code}{col}{reset}"
+                                        for code, col in zip(codes, res)]))
+                output.write("\n")
+        # the reader may go away early, e.g. when piped into `head`
+        with suppress(BrokenPipeError):
+            sys.stdout.write(output.getvalue())
+            sys.stdout.flush()
 
     @staticmethod
     @spinner("Reindexing vault...", "Reindexing terminated successfully.")
@@ -189,24 +252,16 @@ class SubcommandsMixin:
             my_zk.index_vault()
 
     @staticmethod
+    @_report_errors(_note_errors)
     def next(args: Namespace) -> None:
-        try:
-            my_zk = SubcommandsMixin._create_zettelkasten(args)
-            zk_id = SubcommandsMixin._get_zk_id(args, my_zk)
-            if zk_id is None:
-                return
-            my_zk.next(args.title[0],
-                       zk_id,
-                       args.no_confirmation,
-                       args.strict)
-        except zk.ZettelkastenException as e:
-            print(e)
-        except WrapperException as e:
-            print(e)
-        except EditorException as e:
-            print(e)
-        except NoteException as e:
-            print(e)
+        my_zk = SubcommandsMixin._create_zettelkasten(args)
+        zk_id = SubcommandsMixin._get_zk_id(args, my_zk)
+        if zk_id is None:
+            return
+        my_zk.next(args.title[0],
+                   zk_id,
+                   args.no_confirmation,
+                   args.strict)
 
     @staticmethod
     @spinner("Syncing with remote and reindexing...", "Syncing terminated successfully.")
@@ -217,24 +272,27 @@ class SubcommandsMixin:
 
     @staticmethod
     def info(args: Namespace) -> None:
+        zk = _zk_module()
         my_zk = SubcommandsMixin._create_zettelkasten(args)
         zk_id = SubcommandsMixin._get_zk_id(args, my_zk)
         if zk_id is None:
             return
+        # decide on coloring once, not for every field
+        if args.no_color:
+            label = str
+        else:
+            def label(col: str) -> str:
+                return f"{_FG[_COLORS.get(col, 'WHITE')]}{col}{_RESET}"
         try:
             result = my_zk.get_metadata(str(zk_id))
             for col in result:
                 if col in ['tag', 'link']:
                     continue
-                text = color(col, _COLORS.get(col, "WHITE"),
-                             no_color=args.no_color)
-                print(f"{text}: {result[col]}")
+                print(f"{label(col)}: {result[col]}")
             for col in ['tag', 'link']:
                 length_text = len(col+": ")
                 elements = list(result[col])
-                text = color(col, _COLORS.get(col, "WHITE"),
-                             no_color=args.no_color)
-                print(f"{text}: {elements[0]}")
+                print(f"{label(col)}: {elements[0]}")
                 for el in elements[1:]:
                     print(" "*length_text + el)
 
@@ -245,11 +303,12 @@ class SubcommandsMixin:
 
     @staticmethod
     def _create_zettelkasten(args: Namespace) -> Zettelkasten:
-        my_zk = Zettelkasten(vault=args.vault,
-                             author=args.author[0],
-                             autocommit=args.autocommit,
-                             autosync=args.autosync,
-                             editor=args.editor[0])
+        zk = _zk_module()
+        my_zk = zk.Zettelkasten(vault=args.vault,
+                                author=args.author[0],
+                                autocommit=args.autocommit,
+                                autosync=args.autosync,
+                                editor=args.editor[0])
 
         return my_zk
 
@@ -259,7 +318,9 @@ class SubcommandsMixin:
 
     @staticmethod
     def _get_zk_id(args: Namespace, my_zk: Zettelkasten) -> None:
+        zk = _zk_module()
         if args.zk_id is None or not args.zk_id:
+            from notepy.cli.interactive_selection import Interactive
             loop = Interactive(my_zk)
             zk_id = loop.run()
         else:
@@ -277,7 +338,62 @@ class SubcommandsMixin:
         return zk_id
 
 
-@dataclass
+# subcommand name -> handler, resolved once instead of per parser.
+SubcommandsMixin._HANDLERS = {
+    name: getattr(SubcommandsMixin, name)
+    for name in ("initialize", "new", "edit", "open", "delete", "print",
+                 "list", "reindex", "next", "sync", "info")
+}
+
+
+def _split_fields(cls: type) -> tuple[tuple[tuple[str, str], ...],
+                                      tuple[tuple[str, str, str], ...]]:
+    """
+    Get subcommands and flags from the dataclass fields.
+
+    If the field starts with `command_` it means it's
+    a subcommand. If it starts with `flag_`, it is a flag.
+
+    :param cls: the dataclass to inspect.
+    :return: (name, field) pairs of the subcommands and
+             (name, option, field) triples of the flags.
+    """
+    commands: list[tuple[str, str]] = []
+    flags: list[tuple[str, str, str]] = []
+    for comm in fields(cls):
+        if comm.name.startswith("command_"):
+            commands.append((comm.name.removeprefix("command_"), comm.name))
+        elif comm.name.startswith("flag_"):
+            name = comm.name.removeprefix("flag_")
+            flags.append((name, "--"+name, comm.name))
+
+    return tuple(commands), tuple(flags)
+
+
+class _LazyParser(ArgumentParser):
+    """
+    Parser of a subcommand whose flags and defaults are added
+    only when that subcommand is actually invoked. Upfront, the
+    parser is empty: the top-level help and the choice validation
+    only need the names and help strings of the subcommands.
+    """
+
+    def __init__(self,
+                 *args: Any,
+                 build: Callable[[ArgumentParser], None] | None = None,
+                 **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._build = build
+
+    def parse_known_args(self, *args: Any, **kwargs: Any) -> Any:
+        # add the flags of the invoked subcommand before parsing
+        if self._build is not None:
+            build, self._build = self._build, None
+            build(self)
+        return super().parse_known_args(*args, **kwargs)
+
+
+@dataclass(slots=True)
 class Cli(SubcommandsMixin):
     """
     Provide interface abstraction
@@ -301,6 +417,10 @@ class Cli(SubcommandsMixin):
     flag_autocommit: MutableMapping[str, Any]
     flag_autosync: MutableMapping[str, Any]
     flag_editor: MutableMapping[str, Any]
+    global_parser: ArgumentParser = field(init=False, repr=False)
+    subparsers: Any = field(init=False, repr=False)
+    _COMMAND_NAMES: ClassVar[tuple[tuple[str, str], ...]] = ()
+    _FLAG_NAMES: ClassVar[tuple[tuple[str, str, str], ...]] = ()
 
     def __post_init__(self) -> None:
         # define global parser
@@ -310,53 +430,47 @@ class Cli(SubcommandsMixin):
 
         # add the normal global flags
         if flags:
-            for flag in flags:
-                flag_config = getattr(self, "flag_"+flag)
-                self.global_parser.add_argument("--"+flag,
-                                                **flag_config)
+            for _, option, attr in flags:
+                self.global_parser.add_argument(option,
+                                                **getattr(self, attr))
 
         # add the subcommands
         if commands:
-            self.subparsers = self.global_parser.add_subparsers()
-            for command in commands:
-                self._create_subparsers(command)
+            self.subparsers = self.global_parser.add_subparsers(parser_class=_LazyParser)
+            for command, attr in commands:
+                self._create_subparsers(command, attr)
 
-    def _get_commands(self) -> tuple[list[str], list[str]]:
+    def _get_commands(self) -> tuple[tuple[tuple[str, str], ...],
+                                     tuple[tuple[str, str, str], ...]]:
         """
-        Get subcommands and flags from the dataclass fields.
-
-        If the field starts with `command_` it means it's
-        a subcommand. If it starts with `flag_`, it is a flag.
+        Get subcommands and flags, as precomputed from the
+        dataclass fields by `_split_fields`.
         """
-        commands: list[str] = []
-        flags: list[str] = []
-        for comm in fields(self):
-            if comm.name.startswith("command_"):
-                commands.append(comm.name.removeprefix("command_"))
-            elif comm.name.startswith("flag_"):
-                flags.append(comm.name.removeprefix("flag_"))
-
-        return commands, flags
+        return self._COMMAND_NAMES, self._FLAG_NAMES
 
-    def _create_subparsers(self, command: str) -> None:
+    def _create_subparsers(self, command: str, attr: str) -> None:
         """
         Create a subparser given the command.
 
         :param command: command to create a subparser for.
+        :param attr: field holding the command configuration.
         """
         # get the command configuration: help, flags, etc.
-        command_config = getattr(self, "command_"+command)
-        parser = self.subparsers.add_parser(command,
-                                            help=command_config.get("help", ""))
+        command_config = getattr(self, attr)
+        # the default action when invoking this sub-command.
+        default_func = self._HANDLERS.get(command, self.not_implemented)
+
+        # the parser is built only when the sub-command is invoked.
+        def build(parser: ArgumentParser) -> None:
+            # add the command's sub-flags
+            for flag, flag_config in command_config.get("flags_items", ()):
+                parser.add_argument(flag, **flag_config)
 
-        # get the command's sub-flags
-        subflags = command_config.get('flags', {})
-        for flag in subflags:
-            parser.add_argument(flag, **subflags[flag])
+            parser.set_defaults(func=default_func)
 
-        # set the default action when invoking this sub-command.
-        default_func = getattr(self, command, self.not_implemented)
-        parser.set_defaults(func=default_func)
+        self.subparsers.add_parser(command,
+                                   help=command_config.get("help", ""),
+                                   build=build)
 
     def parse(self, *args: Any, **kwargs: Any) -> Namespace:
         cli_args: Namespace = self.global_parser.parse_args(*args, **kwargs)
@@ -368,13 +482,15 @@ class Cli(SubcommandsMixin):
         if hasattr(cli_args, 'func'):
             cli_args.func(cli_args)
         else:
-            cli_args = self.global_parser.parse_args(['--help'])
-            print(cli_args.help)
+            # no subcommand given: show the help directly
+            # instead of parsing a second, synthetic command line.
+            self.global_parser.print_help()
+            self.global_parser.exit()
 
     def __call__(self, *args: Any, **kwargs: Any) -> None:
-        cli_args = self.parse(*args, **kwargs)
-        if hasattr(cli_args, 'func'):
-            cli_args.func(cli_args)
-        else:
-            cli_args = self.global_parser.parse_args(['--help'])
-            print(cli_args.help)
+        self.run(*args, **kwargs)
+
+
+# the fields of Cli are fixed at class definition,
+# so subcommands and flags are derived only once.
+Cli._COMMAND_NAMES, Cli._FLAG_NAMES = _split_fields(Cli)
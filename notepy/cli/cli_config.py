@@ -1,9 +1,10 @@
 from pathlib import Path
-from collections.abc import MutableMapping
+from collections.abc import Mapping, MutableMapping
+from types import MappingProxyType
 from typing import Any
 
 
-_COMMANDS: MutableMapping[str, Any] = {
+_commands: MutableMapping[str, Any] = {
     "command_initialize": {
         "help": "Initialize the vault.",
         "flags": {
@@ -242,3 +243,12 @@ _COMMANDS: MutableMapping[str, Any] = {
         "help": "Editor to use."
     }
 }
+
+# flatten each sub-command's flags once, so that building its parser
+# only has to walk a tuple.
+for _name, _config in _commands.items():
+    if _name.startswith("command_"):
+        _config["flags_items"] = tuple(_config.get("flags", {}).items())
+del _name, _config
+
+_COMMANDS: Mapping[str, Any] = MappingProxyType(_commands)
@@ -27,16 +27,33 @@ class Colors(Enum):
     RESET = "\033[0m"
 
     def colorize(self, text: Show) -> str:
-        return self.value + str(text) + Colors.RESET.value
+        return f"{_ANSI_VALUES[self.name]}{text}{_RESET}"
+
+
+# escape codes resolved once, as plain strings, so that callers
+# coloring many strings in a loop skip the Enum machinery
+_ANSI_VALUES = {name: member.value
+                for name, member in Colors.__members__.items()}
+_RESET = _ANSI_VALUES["RESET"]
+_FG = {name.removesuffix("_FG"): value
+       for name, value in _ANSI_VALUES.items()
+       if name.endswith("_FG")}
+# (colour, context) -> escape code, e.g. ("CYAN", "FG") -> "\033[36m"
+_COLOR_TABLE = {tuple(name.split("_")): value
+                for name, value in _ANSI_VALUES.items()
+                if name != "RESET"}
 
 
 def color(text: Show,
           COLOUR: str,
           context: str = "FG",
           no_color: bool = False) -> str:
-    if context not in ["FG", "BG"]:
-        raise ValueError("context can only be 'FG' or 'BG'.")
-    if not no_color:
-        color_name = "_".join([COLOUR, context])
-        return Colors[color_name].colorize(text)
-    return str(text)
+    if no_color:
+        return str(text)
+    try:
+        prefix = _COLOR_TABLE[(COLOUR, context)]
+    except KeyError:
+        if context not in ("FG", "BG"):
+            raise ValueError("context can only be 'FG' or 'BG'.") from None
+        raise
+    return f"{prefix}{text}{_RESET}"
@@ -1,12 +1,26 @@
 import curses
+from collections import OrderedDict
 from enum import IntEnum
 import re
+from string import ascii_lowercase, ascii_uppercase
 
 from notepy.zettelkasten.zettelkasten import Zettelkasten
+from notepy.parser.like import compile_like
 
 
 ESCAPE_DELAY = 50
 POSITION_OFFSET = 2
+# milliseconds without keystrokes before querying the notes
+DEBOUNCE_DELAY = 30
+# narrow previous results in python only below this size
+LOCAL_FILTER_LIMIT = 500
+# number of queries whose results are kept, e.g. for backspacing
+RESULTS_CACHE_SIZE = 64
+# SQLite's LIKE folds the case of ASCII letters only
+_ASCII_LOWER = str.maketrans(ascii_uppercase, ascii_lowercase)
+# filters typed in the search bar: `#tag` and `[[link]]`
+_TAG_PATTERN = re.compile(r"#[^ ]*")
+_LINK_PATTERN = re.compile(r"\[\[(.*?)\]\]")
 
 
 class OddKeys(IntEnum):
@@ -15,6 +29,26 @@ class OddKeys(IntEnum):
     ALT_ENTER_2 = 13
 
 
+# keys that end an editing burst
+_NON_EDITING_KEYS = frozenset((curses.KEY_ENTER, OddKeys.ALT_ENTER_1,
+                               OddKeys.ALT_ENTER_2, OddKeys.ESCAPE,
+                               curses.KEY_UP, curses.KEY_DOWN,
+                               curses.KEY_RESIZE))
+
+
+def _contains_filter(pattern: str, rows: list[tuple[str, int]]) -> list[tuple[str, int]]:
+    """
+    Keep the rows whose title matches a LIKE pattern, as the database would.
+
+    :param pattern: the LIKE pattern.
+    :param rows: (title, ID) rows to filter.
+    :return: the matching rows, in the same order.
+    """
+    match = compile_like(pattern).match
+
+    return [row for row in rows if match(row[0])]
+
+
 # TODO: add window to the right containing metadata information if there is enough space
 # TODO: implement tag and link filtering
 # TODO: implement multiselection
@@ -26,19 +60,57 @@ class Interactive:
         self.cursor_pos = 0
         self.relative_cursor = 0
         self.relative_start = 0
-        self.prev_relative_start = 0
+        # characters of the text typed, edited in place
+        self._buffer = []
+        # last query and its results, to narrow them while typing
+        self._last_query = None
+        self._last_results = []
+        # results of the most recent queries, least recent first
+        self._results_cache = OrderedDict()
+        # text currently shown on each line of the results,
+        # and line where the pointer is drawn
+        self._drawn = {}
+        self._pointer_line = None
+        # results padded to the screen width, computed once per query
+        self._padded_for = None
+        self._padded = []
+        # results and scroll offset last drawn
+        self._shown = None
+        # screen width and blank line, updated on resize
+        self._on_resize()
         curses.start_color()
         curses.init_pair(1, curses.COLOR_BLUE, curses.COLOR_BLACK)
         curses.init_pair(2, curses.COLOR_CYAN, curses.COLOR_BLACK)
+        self._pointer_attr = curses.color_pair(1)
+        self._text_attr = curses.color_pair(2)
 
     def print_results(self, results, pos):
-        curses.curs_set(False)
-        template = "  {}"
+        # neither the results nor the scrolling changed
+        if (self._shown is not None
+                and self._shown[0] is results
+                and self._shown[1] == self.relative_start):
+            return
+        self._shown = (results, self.relative_start)
+        if results is not self._padded_for:
+            template = "  {}"
+            self._padded = [self.pad_text(template.format(res[0]))
+                            for res in results]
+            self._padded_for = results
+        padded = self._padded
+        blank = self._blank
+        width = self._width
+        drawn = self._drawn
+        # the pointer glyph overwrote part of its line
+        drawn.pop(self._pointer_line, None)
         for i in range(POSITION_OFFSET, curses.LINES):
-            text = self.pad_results(i+self.relative_start, results, template)
-            self.w.addstr(i, 0, text)
-            self.w.refresh()
-        curses.curs_set(True)
+            index = i + self.relative_start - POSITION_OFFSET
+            text = padded[index] if index < len(padded) else blank
+            # only rewrite the lines that changed
+            if drawn.get(i) != text:
+                self.w.addnstr(i, 0, text, width)
+                drawn[i] = text
+        # the lines are flushed to the terminal at once,
+        # by the refresh implied when waiting for the next key
 
     @staticmethod
     def check_cursor_pos(text, pos):
@@ -62,31 +134,33 @@ class Interactive:
                 pos += 1
             case curses.KEY_RESIZE:
                 curses.resize_term(*self.w.getmaxyx())
+                self._on_resize()
                 redraw = True
             case curses.KEY_BACKSPACE:
-                cursor_pos = self.check_cursor_pos(text, self.cursor_pos-1)
-                new_text = text[:cursor_pos] + text[cursor_pos+1:] if self.cursor_pos > 0 else text
-                self.cursor_pos = cursor_pos
-                if text != new_text:
+                if self.cursor_pos > 0:
+                    self.cursor_pos = self.check_cursor_pos(text, self.cursor_pos-1)
+                    del self._buffer[self.cursor_pos]
+                    text = "".join(self._buffer)
                     pos = 0
                     self.relative_start = 0
-                text = new_text
             case curses.KEY_DC:
-                new_text = text[:self.cursor_pos] + text[self.cursor_pos+1:] if self.cursor_pos <= len(text) else text
-                if text != new_text:
+                if self.cursor_pos < len(self._buffer):
+                    del self._buffer[self.cursor_pos]
+                    text = "".join(self._buffer)
                     pos = 0
                     self.relative_start = 0
-                text = new_text
             case curses.KEY_LEFT:
                 # check cursor position
                 self.cursor_pos = (self.cursor_pos-1) % (len(text)+1)
             case curses.KEY_RIGHT:
                 # check cursor position
                 self.cursor_pos = (self.cursor_pos+1) % (len(text)+1)
-            case _:
-                text = text[:self.cursor_pos] + chr(c) + text[self.cursor_pos:]
-                text = text[:curses.COLS-1]
-                if self.cursor_pos < curses.COLS-1:
+            # only printable characters are typed, not control or function keys
+            case _ if 0x20 <= c < 0x7f or 0xa0 <= c < curses.KEY_MIN:
+                self._buffer.insert(self.cursor_pos, chr(c))
+                del self._buffer[self._width:]
+                text = "".join(self._buffer)
+                if self.cursor_pos < self._width:
                     self.cursor_pos += 1
                 pos = 0
                 self.relative_start = 0
@@ -119,49 +193,105 @@ class Interactive:
 
         return pos, redraw
 
-    def draw_pointer(self, pos, old_pos):
-        if (cancel_pos := old_pos-self.prev_relative_start+POSITION_OFFSET) < curses.LINES:
-            self.w.addstr(cancel_pos, 0, " ")
-        self.prev_relative_start = self.relative_start
-        self.w.addstr(pos-self.relative_start+POSITION_OFFSET, 0, ">", curses.color_pair(1))
+    def draw_pointer(self, pos):
+        # erase the pointer where it was drawn, even if the
+        # position was reset since, e.g. by editing the text
+        if self._pointer_line is not None and self._pointer_line < curses.LINES:
+            self.w.addstr(self._pointer_line, 0, " ")
+        self._pointer_line = pos-self.relative_start+POSITION_OFFSET
+        self.w.addstr(self._pointer_line, 0, ">", self._pointer_attr)
 
     @staticmethod
     def parse_text(text: str) -> tuple[str, list[str], list[str]]:
-        tag_pattern = re.compile(r"#[^ ]*", re.IGNORECASE)
-        link_pattern = re.compile(r"\[\[.*?\]\]")
-        raw_tags = re.findall(tag_pattern, text)
-        raw_links = re.findall(link_pattern, text)
-        tags = []
-        links = []
-        for tag in raw_tags:
-            text = text.replace(tag, "")
-            tags.append("#%" + tag[1:] + "%")
-        for link in raw_links:
-            text = text.replace(link, "")
-            links.append("%"+link.removeprefix('[[').removesuffix(']]')+"%")
+        raw_tags = _TAG_PATTERN.findall(text)
+        raw_links = _LINK_PATTERN.findall(text)
+        tags = ["#%" + tag[1:] + "%" for tag in raw_tags]
+        links = ["%" + link + "%" for link in raw_links]
+        if raw_tags:
+            text = _TAG_PATTERN.sub("", text)
+        if raw_links:
+            text = _LINK_PATTERN.sub("", text)
         tags = tags if tags else None
         links = links if links else None
         return text.strip(), tags, links
 
-    @staticmethod
-    def pad_text(text):
-        length = len(text)
-        length_to_fill = curses.COLS - length if length < curses.COLS else 0
-        padding = " " * (length_to_fill-1)
+    def pad_text(self, text):
+        width = self._width
 
-        padded_text = text + padding
+        return text.ljust(width)[:width]
 
-        return padded_text[:curses.COLS-1]
+    def _on_resize(self):
+        """
+        Cache the screen size and what depends on it,
+        and forget what was drawn on the screen.
+        """
+        self._width = curses.COLS - 1
+        self._blank = " " * self._width
+        self._drawn = {}
+        self._padded_for = None
+        self._shown = None
 
-    @staticmethod
-    def pad_results(draw_pos, results, template):
-        if draw_pos < len(results)+POSITION_OFFSET:
-            title = results[draw_pos-POSITION_OFFSET][0]
-            text = Interactive.pad_text(template.format(title))
+    def drain_edits(self, text, pos):
+        """
+        Apply the editing keys already queued, without waiting for more.
+        The first other key is put back, for the main loop to handle.
+
+        :param text: the current text.
+        :param pos: the current position in the results.
+        :return: the updated text and position.
+        """
+        self.w.timeout(0)
+        try:
+            while (c := self.w.getch()) != curses.ERR:
+                if c in _NON_EDITING_KEYS:
+                    curses.ungetch(c)
+                    break
+                text, pos, _, _ = self.catch_key(c, text, pos)
+        finally:
+            self.w.timeout(DEBOUNCE_DELAY)
+
+        return text, pos
+
+    def query(self, text):
+        """
+        Get the notes matching the text typed. If the text amounts to
+        the previous query, e.g. after typing and deleting a character,
+        the previous results are reused, and so are those of the other
+        recent queries, e.g. when backspacing. If it only extends the
+        previous query, its results are narrowed down instead of
+        querying the database again.
+
+        :param text: the text typed.
+        :return: the notes matching the text.
+        """
+        parsed_text, tags, links = self.parse_text(text)
+        needle = parsed_text.translate(_ASCII_LOWER)
+        query = (needle,
+                 tuple(tags) if tags else None,
+                 tuple(links) if links else None)
+
+        last = self._last_query
+        if query == last:
+            return self._last_results
+        if (results := self._results_cache.get(query)) is not None:
+            self._results_cache.move_to_end(query)
+        elif (last is not None
+                and last[1:] == query[1:]
+                and needle.startswith(last[0])
+                and len(self._last_results) < LOCAL_FILTER_LIMIT):
+            results = _contains_filter(f"%{parsed_text}%", self._last_results)
         else:
-            text = Interactive.pad_text(" ")
+            results = self.zk.list_notes(title=[f"%{parsed_text}%"],
+                                         tags=tags,
+                                         links=links)
+
+        self._last_query = query
+        self._last_results = results
+        self._results_cache[query] = results
+        if len(self._results_cache) > RESULTS_CACHE_SIZE:
+            self._results_cache.popitem(last=False)
 
-        return text
+        return results
 
     def _main(self):
         # clear screen
@@ -172,43 +302,74 @@ class Interactive:
         curses.set_escdelay(ESCAPE_DELAY)
         # initial text
         text = ""
+        self._buffer = list(text)
         # show all the notes at start
-        result_list = self.zk.list_notes(title=[f"%{text}%"])
+        result_list = self.query(text)
         # inital position of the cursor
         pos = 0
         self.print_results(result_list, pos)
-        self.draw_pointer(pos, 0)
-        self.w.addstr(0, 0, text, curses.color_pair(2))
+        self.draw_pointer(pos)
+        self.w.addstr(0, 0, text, self._text_attr)
+        # wait for keys without a timeout, as long as no query is pending
+        self.w.timeout(-1)
+        pending_query = False
         # break the loop when pressing ESC or C-c
         while (c := self.w.getch()) != OddKeys.ESCAPE:
-            old_pos = pos
+            if c == curses.ERR:
+                # no key pressed: update the list of notes if the text changed
+                if pending_query:
+                    pending_query = False
+                    self.w.timeout(-1)
+                    result_list = self.query(text)
+                    self.print_results(result_list, pos)
+                    self.draw_pointer(pos)
+                    self.w.move(0, self.cursor_pos)
+                continue
+
             # update text and pos based on key pressed
             new_text, pos, endit, redraw_key = self.catch_key(c, text, pos)
             if endit:
                 break
 
-            # enforce checks on pos
-            pos, redraw_pos = self.check_pos(pos, result_list)
-            # only redraw results if input changed
-            if new_text != text or redraw_pos or redraw_key:
-                # parse the text to intercept tag or link filters
-                parsed_text, tags, links = self.parse_text(new_text)
+            if new_text != text:
+                # apply the edits already waiting, e.g. pasted text,
+                # so that the input is drawn once for the whole burst
+                new_text, pos = self.drain_edits(new_text, pos)
+                # show the input right away, the query can wait: keys
+                # are waited for at most DEBOUNCE_DELAY, so that the
+                # notes are queried only once typing pauses
                 text = new_text
-                # update list of notes
-                result_list = self.zk.list_notes(title=[f"%{parsed_text}%"],
-                                                 tags=tags,
-                                                 links=links)
+                pending_query = True
+                self.w.timeout(DEBOUNCE_DELAY)
+                padded_text = self.pad_text(text)
+                self.w.addstr(0, 0, padded_text, self._text_attr)
+                self.w.move(0, self.cursor_pos)
+                continue
+            if pending_query:
+                # moving through the results needs them up to date
+                pending_query = False
+                self.w.timeout(-1)
+                previous_results = result_list
+                result_list = self.query(text)
+                redraw_key = redraw_key or result_list is not previous_results
 
+            # enforce checks on pos
+            pos, redraw_pos = self.check_pos(pos, result_list)
+            # only redraw results if needed
+            if redraw_pos or redraw_key:
                 self.print_results(result_list, pos)
 
                 # pad the text
                 padded_text = self.pad_text(text)
-                self.w.addstr(0, 0, padded_text, curses.color_pair(2))
+                self.w.addstr(0, 0, padded_text, self._text_attr)
 
-            self.draw_pointer(pos, old_pos)
+            self.draw_pointer(pos)
             # put the cursor at the end of input
             self.w.move(0, self.cursor_pos)
 
+        if pending_query:
+            result_list = self.query(text)
+
         # if escape was pressed and there are results, return
         # the note ID.
         if len(result_list) > 0 and c != OddKeys.ESCAPE:
@@ -1,2 +1,4 @@
-from notepy.parser.parser import HeaderParser, BodyParser
-from notepy.parser.parser import FrontmatterException, BodyException
\ No newline at end of file
+from notepy.parser.parser import HeaderParser, BodyParser, NoteParser
+from notepy.parser.parser import parse_paths
+from notepy.parser.parser import FrontmatterException, BodyException
+from notepy.parser.like import compile_like, Matcher, LikeKind
\ No newline at end of file
@@ -0,0 +1,138 @@
+"""
+Match strings against SQL LIKE patterns in python
+"""
+import re
+from enum import Enum
+from dataclasses import dataclass, field
+from functools import lru_cache
+from string import ascii_lowercase, ascii_uppercase
+from typing import Optional
+
+# SQLite's LIKE folds the case of ASCII letters only
+_ASCII_LOWER = str.maketrans(ascii_uppercase, ascii_lowercase)
+_MATCHERS_CACHE_SIZE = 128
+
+
+class LikeKind(Enum):
+    EQUAL = "equal"
+    STARTS_WITH = "starts_with"
+    ENDS_WITH = "ends_with"
+    CONTAINS = "contains"
+    MULTI_CONTAINS = "multi_contains"
+    GENERIC = "generic"
+
+
+@dataclass(slots=True)
+class Matcher:
+    """
+    A LIKE pattern compiled to the cheapest string operations that match it.
+    Build it with `compile_like`.
+
+    :param kind: the shape of the pattern.
+    :param pieces: the literal pieces of the pattern, split on `%`.
+    :param starts: whether the first piece must start the string.
+    :param ends: whether the last piece must end the string.
+    :param regex: regular expression for patterns with `_`.
+    """
+    kind: LikeKind
+    pieces: tuple[str, ...]
+    starts: bool
+    ends: bool
+    regex: Optional[re.Pattern[str]] = None
+    min_length: int = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.min_length = sum(map(len, self.pieces))
+
+    def match(self, text: str) -> bool:
+        """
+        Check whether text matches the pattern, like SQLite's LIKE does.
+
+        :param text: the text to check.
+        :return: whether it matches.
+        """
+        if len(text) < self.min_length:
+            return False
+        text = text.translate(_ASCII_LOWER)
+
+        match self.kind:
+            case LikeKind.CONTAINS:
+                return self.pieces[0] in text
+            case LikeKind.EQUAL:
+                return text == self.pieces[0]
+            case LikeKind.STARTS_WITH:
+                return text.startswith(self.pieces[0])
+            case LikeKind.ENDS_WITH:
+                return text.endswith(self.pieces[0])
+            case LikeKind.MULTI_CONTAINS:
+                return self._match_pieces(text)
+            case _:
+                return self.regex.fullmatch(text) is not None
+
+    def _match_pieces(self, text: str) -> bool:
+        """
+        Find the pieces in order, each after the previous one.
+
+        :param text: the text to check, already folded.
+        :return: whether it matches.
+        """
+        pieces = self.pieces
+        start = 0
+        end = len(text)
+        if self.starts:
+            if not text.startswith(pieces[0]):
+                return False
+            start = len(pieces[0])
+            pieces = pieces[1:]
+        if self.ends:
+            if not text.endswith(pieces[-1]) or end - len(pieces[-1]) < start:
+                return False
+            end -= len(pieces[-1])
+            pieces = pieces[:-1]
+
+        for piece in pieces:
+            position = text.find(piece, start, end)
+            if position < 0:
+                return False
+            start = position + len(piece)
+
+        return True
+
+
+@lru_cache(maxsize=_MATCHERS_CACHE_SIZE)
+def compile_like(pattern: str) -> Matcher:
+    """
+    Compile a LIKE pattern: `%` matches any sequence of characters,
+    `_` any single character, and ASCII letters match regardless of case.
+
+    :param pattern: the LIKE pattern.
+    :return: the matcher for the pattern.
+    """
+    pattern = pattern.translate(_ASCII_LOWER)
+    starts = not pattern.startswith("%")
+    ends = not pattern.endswith("%")
+    pieces = tuple(piece for piece in pattern.split("%") if piece)
+
+    if "_" in pattern:
+        regex = re.compile("".join(".*" if char == "%" else "." if char == "_"
+                                   else re.escape(char)
+                                   for char in pattern),
+                           re.DOTALL)
+        return Matcher(LikeKind.GENERIC, pieces, starts, ends, regex)
+
+    if len(pieces) == 1 and "%" not in pattern:
+        kind = LikeKind.EQUAL
+    elif len(pieces) == 1 and starts:
+        kind = LikeKind.STARTS_WITH
+    elif len(pieces) == 1 and ends:
+        kind = LikeKind.ENDS_WITH
+    elif len(pieces) == 1:
+        kind = LikeKind.CONTAINS
+    elif not pieces:
+        # only `%`, or empty pattern matching only the empty string
+        kind = LikeKind.CONTAINS if "%" in pattern else LikeKind.EQUAL
+        pieces = ("",)
+    else:
+        kind = LikeKind.MULTI_CONTAINS
+
+    return Matcher(kind, pieces, starts, ends)
@@ -1,23 +1,32 @@
 """
 Parsers for various elements of a note
 """
-from typing import Any, TypeVar, Optional, TypeAlias
-from collections.abc import Collection, Sequence, MutableMapping
+import re
+from typing import Any, TypeVar, Optional, TypeAlias, TextIO
+from collections.abc import Collection, Sequence, MutableMapping, Iterable, Iterator
+from functools import partial
+from multiprocessing import Pool
 from abc import ABC, abstractmethod
 from pathlib import Path
-from io import TextIOWrapper
+from io import TextIOWrapper, StringIO
 from datetime import datetime
 from string import punctuation
-import re
+
+from notepy.utils import expanduser
 
 Target = TypeVar("Target", str, Path)
 Parsed: TypeAlias = MutableMapping[str, Any]
-Output: TypeAlias = tuple[Parsed, TextIOWrapper]
+Output: TypeAlias = tuple[Parsed, TextIO]
 
 _IN_CONTEXT = True
 _OUT_CONTEXT = False
 _DATE_FORMAT = "%Y-%m-%dT%H:%M:%S"
+_READ_BUFFER_SIZE = 1 << 16
 _INVALID_CHARS = punctuation.replace("_", "").replace("#", "")
+# a tag is a word starting with #, delimited by whitespace or by
+# any special char except # and _
+_TAG_SEPARATORS = re.escape(" " + _INVALID_CHARS)
+_TAG_PATTERN = re.compile(f"(?<![^{_TAG_SEPARATORS}])#[^{_TAG_SEPARATORS}]*")
 
 
 def _open_or_return_handle(*,
@@ -35,7 +44,7 @@ def _open_or_return_handle(*,
     :param handle: handle of the file.
     """
     if path:
-        file_obj = open(Path(path).expanduser(), "r")
+        file_obj = open(expanduser(path), "r", buffering=_READ_BUFFER_SIZE)
     elif handle:
         file_obj = handle
     else:
@@ -44,6 +53,33 @@ def _open_or_return_handle(*,
     return file_obj
 
 
+def _read_lines(*,
+                path: Optional[Target] = None,
+                handle: Optional[TextIOWrapper] = None) -> list[str]:
+    """
+    Read the whole file at path, or behind handle, at once
+    and split it into lines, without their newline.
+    A file opened from path is closed afterwards.
+
+    :param path: path to the file.
+    :param handle: handle of the file.
+    :return: lines of the file.
+    """
+    file_obj = _open_or_return_handle(path=path, handle=handle)
+    if file_obj is handle:
+        data = file_obj.read()
+    else:
+        with file_obj:
+            data = file_obj.read()
+
+    # split on newlines only, like iterating the file would
+    lines = data.split("\n")
+    if lines[-1] == "":
+        lines.pop()
+
+    return lines
+
+
 class BaseParser(ABC):
     @abstractmethod
     def parse(self,
@@ -71,6 +107,9 @@ class HeaderParser(BaseParser):
         self.parsing_obj = parsing_obj
         self.delimiter = delimiter
         self.special_names = special_names
+        # dedicated parser of each special name
+        self._special_parsers = {name: getattr(self, f'_{name}_parser', self._id)
+                                 for name in special_names}
 
     def parse(self,
               path: Optional[Target] = None,
@@ -84,12 +123,25 @@ class HeaderParser(BaseParser):
         :return: parsed items in form of a dictionary,
                  and the rest of the file stream
         """
-        file_obj = _open_or_return_handle(path=path, handle=handle)
+        lines = iter(_read_lines(path=path, handle=handle))
+        parsed_obj = self._parse_lines(lines)
+        # hand the rest of the note over to the next parser
+        rest = StringIO("".join(f"{line}\n" for line in lines))
+
+        return parsed_obj, rest
+
+    def _parse_lines(self, lines: Iterator[str]) -> Parsed:
+        """
+        Parse the frontmatter, consuming lines up to its end.
+
+        :param lines: iterator over the lines of the note.
+        :return: parsed items in form of a dictionary.
+        """
         context = _OUT_CONTEXT
         parsing_obj = set(self.parsing_obj)
         parsed_obj: MutableMapping[str, Sequence[str]] = {}
 
-        for line in file_obj:
+        for line in lines:
             clean_line = line.strip()
 
             # check if we're inside frontmatter
@@ -102,17 +154,26 @@ class HeaderParser(BaseParser):
                 continue
 
             name, value = self._line_parser(clean_line, parsing_obj)
-            # apply special parsing to defined special names
-            if name in self.special_names:
-                parser = getattr(self, f'_{name}_parser', self._id)
-                value = parser(value)
-
-            parsed_obj[name] = value
+            parsed_obj[name] = self._value_parser(name, value)
 
         else:
             raise FrontmatterException("Frontmatter has not been closed.")
 
-        return parsed_obj, file_obj
+        return parsed_obj
+
+    def _value_parser(self, name: str, value: str) -> Any:
+        """
+        Apply special parsing to defined special names.
+
+        :param name: name of the frontmatter value.
+        :param value: raw value.
+        :return: the parsed value.
+        """
+        parser = self._special_parsers.get(name)
+        if parser is not None:
+            value = parser(value)
+
+        return value
 
     def _line_parser(self, line: str, parsing_obj: set[str]) -> tuple[str, str]:
         """
@@ -121,27 +182,26 @@ class HeaderParser(BaseParser):
         :param line: line to parse
         :return: (key, value)
         """
-        split_line = line.split(': ')
+        name, separator, value = line.partition(': ')
 
         # error checking for no name/value pair
-        if len(split_line) <= 1:
+        if not separator:
             # if the name has no values, e.g.: `tags:`, don't raise exception
             if line.endswith(':'):
-                split_line = [line.removesuffix(':'), '']
+                name = line[:-1]
             else:
                 error_text = ("The following line is missing a colon "
                               f"followed by whitespace:\n{line}")
                 raise FrontmatterException(error_text)
 
         # error checking for too many colons (no newline allowed)
-        if len(split_line) >= 3:
+        elif ': ' in value:
             error_text = ("The following line has too many colons:"
                           f"\n{line}\n\nYou can have only one colon "
                           "followed by whitespace.")
             raise FrontmatterException(error_text)
 
         # check if name is correct
-        name, value = split_line
         name = name.strip()
         value = value.strip()
         if name not in parsing_obj:
@@ -198,16 +258,7 @@ class HeaderParser(BaseParser):
         """
         # TODO: issue a warning for malformed tags
 
-        # parse out every special char except # and _
-        clean_tags = tags.translate(tags.maketrans(
-            _INVALID_CHARS, ' ' * len(_INVALID_CHARS)))
-        # split tags, clean out whitespace and remove words
-        # not starting with #
-        tmp_tags_list: list[str] = clean_tags.split(' ')
-        tags_list = set([tag for tag in tmp_tags_list
-                         if tag != '' and tag.startswith('#')])
-
-        return tags_list
+        return set(_TAG_PATTERN.findall(tags))
 
     def _id(self, obj: Any) -> Any:
         """
@@ -233,36 +284,58 @@ class BodyParser(BaseParser):
                  ):
         self.header1 = header1
         self.link_del = link_del
+        self._start_link, self._end_link = link_del
+        self._start_length = len(self._start_link)
+        self._end_length = len(self._end_link)
 
     def parse(self,
               path: Optional[Target] = None,
               handle: Optional[TextIOWrapper] = None) -> Output:
-        file_obj = _open_or_return_handle(path=path, handle=handle)
+        lines = _read_lines(path=path, handle=handle)
+
+        return self._parse_lines(lines), StringIO()
+
+    def _parse_lines(self, lines: Iterable[str]) -> Parsed:
+        """
+        Parse the lines of the body for headers and links.
+
+        :param lines: lines of the body.
+        :return: parsed items in form of a dictionary.
+        """
+        header1 = self.header1
+        start_link = self._start_link
+        link_parser = self._link_parser
         headers: list[str] = []
-        links: list[str] = []
+        links: set[str] = set()
         body: list[str] = []
-        context = _OUT_CONTEXT
+        headers_append = headers.append
+        links_update = links.update
+        body_append = body.append
+        lines = iter(lines)
 
-        for line in file_obj:
+        # first line needs to be a title
+        for line in lines:
             clean_line = line.strip()
-            body.append(clean_line)
-
-            # first line needs to be a title
-            if clean_line != "" and not clean_line.startswith(self.header1) and not context:
+            body_append(clean_line)
+            if clean_line.startswith(header1):
+                headers_append(clean_line)
+                break
+            elif clean_line != "":
                 raise BodyException("The body needs to start with a title")
-            elif clean_line.startswith(self.header1) and not context:
-                context = _IN_CONTEXT
 
-            # parse for header 1
-            if clean_line.startswith(self.header1):
-                headers.append(clean_line)
-                continue
+        # the rest of the body, from where the title was found
+        for line in lines:
+            clean_line = line.strip()
+            body_append(clean_line)
 
+            # parse for header 1
+            if clean_line.startswith(header1):
+                headers_append(clean_line)
             # parse for links
-            line_links = self._link_parser(clean_line)
-            links.extend(line_links)
+            elif start_link in clean_line:
+                links_update(link_parser(clean_line))
 
-        return {'header': headers, 'links': set(links), 'body': body}, file_obj
+        return {'header': headers, 'links': links, 'body': body}
 
     def _link_parser(self, line: str) -> Collection[str]:
         """
@@ -272,19 +345,101 @@ class BodyParser(BaseParser):
         :return: set of links contained in the line
         """
 
-        start_link = self.link_del[0]
-        end_link = self.link_del[1]
-        # find links with regex
-        pattern = re.compile(f"{re.escape(start_link)}.*?{re.escape(end_link)}")
-        # remove link pre- and suffixes
-        line_links = [link.removeprefix(start_link).removesuffix(end_link)
-                      for link in pattern.findall(line)]
-        # remove empty link
-        line_links_set = set(link for link in line_links if link != "")
+        start_link = self._start_link
+        end_link = self._end_link
+        line_links_set = set()
+        position = 0
+
+        # a link runs from its opening delimiter to the next closing one
+        while (start := line.find(start_link, position)) >= 0:
+            start += self._start_length
+            end = line.find(end_link, start)
+            if end < 0:
+                break
+            # skip empty link
+            if end > start:
+                line_links_set.add(line[start:end])
+            position = end + self._end_length
 
         return line_links_set
 
 
+class NoteParser(BaseParser):
+    """
+    Parser for a whole note, frontmatter and body in a single pass.
+
+    :param header_parser: parser for the frontmatter.
+    :param body_parser: parser for the body.
+    """
+
+    def __init__(self, header_parser: HeaderParser, body_parser: BodyParser):
+        self.header_parser = header_parser
+        self.body_parser = body_parser
+
+    def parse(self,
+              path: Optional[Target] = None,
+              handle: Optional[TextIOWrapper] = None) -> Output:
+        """
+        Parse the frontmatter and the body of a note.
+
+        :param path: path to the note to parse
+        :return: parsed frontmatter and body in form of a dictionary,
+                 and the file stream
+        """
+        lines = _read_lines(path=path, handle=handle)
+
+        return self.parse_lines(lines), StringIO()
+
+    def parse_lines(self, lines: Iterable[str]) -> Parsed:
+        """
+        Parse a note already split into lines, without their newline.
+
+        :param lines: lines of the note.
+        :return: parsed frontmatter and body in form of a dictionary.
+        """
+        lines = iter(lines)
+        # the body parser picks up the lines where the frontmatter ends
+        frontmatter = self.header_parser._parse_lines(lines)
+        parsed = self.body_parser._parse_lines(lines)
+        parsed['frontmatter'] = frontmatter
+
+        return parsed
+
+
+def _parse_path(note_parser: NoteParser, path: Target) -> Parsed:
+    """
+    Parse the note at path.
+    Module level so that it can be sent to worker processes.
+
+    :param note_parser: parser to use.
+    :param path: path to the note.
+    :return: parsed note.
+    """
+    parsed, _ = note_parser.parse(path=path)
+
+    return parsed
+
+
+def parse_paths(paths: Iterable[Target],
+                note_parser: NoteParser,
+                processes: Optional[int] = None,
+                chunksize: int = 32) -> Iterator[Parsed]:
+    """
+    Parse many notes across worker processes.
+    Results are yielded in the same order as paths.
+
+    :param paths: paths of the notes to parse.
+    :param note_parser: parser to use for every note.
+    :param processes: number of worker processes, defaults to the number of cores.
+    :param chunksize: number of notes sent to a worker at a time.
+    :return: iterator over the parsed notes.
+    """
+    with Pool(processes) as executor:
+        yield from executor.imap(partial(_parse_path, note_parser),
+                                 paths,
+                                 chunksize=chunksize)
+
+
 class FrontmatterException(Exception):
     """This exception is raised when the header is not in the correct format"""
 
@@ -1,33 +1,54 @@
+from __future__ import annotations
+import os
 import sys
-from threading import Thread
-from collections.abc import Callable
 import time
-from functools import wraps
+from collections.abc import Callable
+from functools import cache, wraps
+from itertools import cycle
+from typing import TYPE_CHECKING
 
-from typing import Optional
+if TYPE_CHECKING:
+    from concurrent.futures import ThreadPoolExecutor
 
 _WAIT_TIME = 0.08
+# slow the spinner down for long operations: (seconds elapsed, wait time)
+_BACKOFF = ((1, _WAIT_TIME), (5, 0.15), (float("inf"), 0.3))
 
 
-class PropagatingThread(Thread):
+def _home() -> str:
+    """
+    Home directory of the current user, without the trailing
+    separator that `os.path.expanduser` strips when joining.
     """
-    Thread subclasses to propagate exceptions in the parent context.
-    From: https://stackoverflow.com/questions/2829329/catch-a-threads-exception-in-the-caller-thread
+    return os.path.expanduser("~").rstrip(os.sep)
+
+
+_HOME = _home()
+
+
+def _wait_time(elapsed: float) -> float:
     """
+    Time to wait between frames of the spinner.
 
-    def run(self):
-        self.exc = None
-        try:
-            self.ret = self._target(*self._args, **self._kwargs)
-        except BaseException as e:
-            self.exc = e
+    :param elapsed: seconds since the spinner started.
+    :return: seconds to wait.
+    """
+    for limit, wait_time in _BACKOFF:
+        if elapsed < limit:
+            return wait_time
 
-    def join(self, timeout: Optional[float] = None):
-        super().join(timeout)
-        if self.exc:
-            raise self.exc
+    return _BACKOFF[-1][1]
 
-        return self.ret
+
+@cache
+def _executor() -> ThreadPoolExecutor:
+    """
+    Worker threads running the operations behind the spinners,
+    created on first use and reused by the later ones.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="notepy-spin")
 
 
 def spinner(msg: str = "", epilogue: str = "", format=False) -> Callable:
@@ -39,34 +60,40 @@ def spinner(msg: str = "", epilogue: str = "", format=False) -> Callable:
 
         @wraps(func)
         def threaded(*args, **kwargs):
-            # spawn a thread for the operation
-            thread = PropagatingThread(target=func, args=args, kwargs=kwargs)
+            from concurrent.futures import wait
+
+            # every frame of the spinner has the same length
+            spinner_length = len(f" {spinner_elements[0]} {msg}")
             try:
-                thread.start()
+                # run the operation in a worker thread
+                future = _executor().submit(func, *args, **kwargs)
+
                 # hide the terminal cursor
                 sys.stdout.write("\033[?25l")
                 sys.stdout.flush()
 
-                # spin as long as thread is executing
-                while thread.is_alive():
-                    for spin in spinner_elements:
-                        spinner_string = f" {spin} {msg}"
-                        print(spinner_string, end="\r", flush=True)
-                        time.sleep(_WAIT_TIME)
+                # spin until the operation is done, stopping
+                # as soon as it is, between two frames
+                start = time.monotonic()
+                for frame in cycle(spinner_elements):
+                    print(f" {frame} {msg}", end="\r", flush=True)
+                    done, _ = wait((future,), _wait_time(time.monotonic() - start))
+                    if done:
+                        break
 
-                # get the result
-                res = thread.join()
+                # get the result, or raise the exception of the operation
+                res = future.result()
 
                 # format the epilogue
                 final_output = epilogue.format(res) if format else epilogue
 
                 # delete the spinner output
-                print(" "*len(spinner_string), end="\r", flush=True)
+                print(" "*spinner_length, end="\r", flush=True)
 
                 # print the epilogue
                 print(final_output)
             except BaseException as e:
-                print(" "*len(spinner_string), end="\r", flush=True)
+                print(" "*spinner_length, end="\r", flush=True)
                 print(e)
             finally:
                 # show the cursor again
@@ -77,6 +104,24 @@ def spinner(msg: str = "", epilogue: str = "", format=False) -> Callable:
     return spinner_with_message
 
 
+def expanduser(path: str | os.PathLike[str]) -> str:
+    """
+    Same as `os.path.expanduser`, with the home directory of
+    the current user resolved once at import time.
+
+    :param path: path to expand.
+    :return: expanded path.
+    """
+    path = os.fspath(path)
+    if not path.startswith("~"):
+        return path
+    if path == "~" or path[1] == os.sep:
+        # a root home directory is stripped to nothing
+        return (_HOME + path[1:]) or os.sep
+    # ~user form
+    return os.path.expanduser(path)
+
+
 def ask_for_confirmation(msg: str = "Save note?") -> bool:
     """
     Utility function to ask for confirmation
@@ -1,36 +1,48 @@
 from abc import ABC
 import subprocess
-from shlex import split
+from shlex import join
+from collections.abc import Mapping, Sequence
+from shutil import which
 from pathlib import Path
+from typing import ClassVar
 
 
 # TODO: add possibility to run in background (or use threads)
 # one problem arising is that pushing to git remote takes time.
-def run_and_handle(command: str,
+def run_and_handle(command: Sequence[str],
                    exception: type[Exception],
                    cwd: Path | str = ".",
-                   comment: str = "") -> subprocess.CompletedProcess[bytes]:
+                   comment: str = "",
+                   env: Mapping[str, str] | None = None,
+                   capture: bool = False,
+                   input: bytes | None = None) -> subprocess.CompletedProcess[bytes]:
     """
     Utility function for easy CalledProcessError handling. It calls a command
     and manages exceptions by calling GitException, together with the stderr
     of the process.
 
-    :param command: the command to execute.
+    :param command: the command to execute, as a list of arguments.
     :param cwd: the working directory of the environment for the command.
     :param comment: optional comment to add to the exception message.
+    :param env: optional environment for the command.
+    :param capture: whether to keep the stdout of the command. If not,
+                    it is discarded and only stderr is kept for errors.
+    :param input: optional data to write to the stdin of the command.
     :return: the completed process object.
     """
-    split_cmd = split(command)
-    process_result = subprocess.run(split_cmd,
+    process_result = subprocess.run(command,
                                     cwd=cwd,
-                                    stderr=subprocess.STDOUT,
-                                    stdout=subprocess.PIPE)
+                                    env=env,
+                                    input=input,
+                                    stderr=subprocess.PIPE,
+                                    stdout=subprocess.PIPE if capture else subprocess.DEVNULL)
 
     process_returncode = process_result.returncode
     if process_returncode != 0:
-        error_message = (f'Command "{command}" returned a non-zero exit status '
+        output = (process_result.stdout or b"") + process_result.stderr
+        error_message = (f'Command "{join(command)}" returned a non-zero exit status '
                          f"{process_returncode}. Below is the full stderr:\n\n"
-                         f"{process_result.stdout.decode('utf-8')}")
+                         f"{output.decode('utf-8')}")
         error_message = error_message + \
             f"\n\n{comment}" if comment else error_message
         raise exception(error_message)
@@ -45,22 +57,31 @@ class BaseWrapper(ABC):
     :param cmd: the CLI command to wrap.
     """
 
+    # absolute paths of the commands already looked up in PATH,
+    # shared by all the wrappers. None if missing.
+    _paths: ClassVar[dict[str, str | None]] = {}
+
     def __init__(self, cmd: str):
         self.cmd = cmd
-        self._cmd_exists()
+        self.cmd_path = self._cmd_exists()
 
-    def _cmd_exists(self) -> None:
+    def _cmd_exists(self) -> str:
         """
         Check that the command is present on the system.
+
+        :return: the absolute path of the command, so that
+                 running it doesn't search PATH again.
         """
         try:
-            subprocess.run(['which', self.cmd], capture_output=True, check=True)
-        except FileNotFoundError:
-            raise WrapperException('`which` is not present on your system. '
-                                   'Please install it before anything else.')
-        except subprocess.CalledProcessError:
+            path = BaseWrapper._paths[self.cmd]
+        except KeyError:
+            path = BaseWrapper._paths[self.cmd] = which(self.cmd)
+
+        if path is None:
             raise WrapperException(f"'{self.cmd}' is not present on your system.")
 
+        return path
+
 
 class WrapperException(Exception):
     """Exception to raise whenever some CLI wrapper throws"""
@@ -4,6 +4,7 @@ from typing import Optional
 import subprocess
 
 from notepy.wrappers.base_wrapper import BaseWrapper, WrapperException
+from notepy.utils import expanduser
 
 
 class Editor(BaseWrapper):
@@ -33,9 +34,9 @@ class Editor(BaseWrapper):
         Edit the given path
         """
 
-        path = Path(path).expanduser()
-        cwd = Path(cwd).expanduser()
-        command: tuple[str, Path] = (self.editor, path)
+        path = expanduser(path)
+        cwd = expanduser(cwd)
+        command: tuple[str, str] = (self.cmd_path, path)
         process_result = subprocess.run(command,
                                         cwd=cwd)
         process_returncode = process_result.returncode
@@ -50,9 +51,8 @@ class Editor(BaseWrapper):
         Edit the notes at the given paths
         """
 
-        paths = [Path(path).expanduser() for path in paths]
-        cwd = Path(cwd).expanduser()
-        command = [self.editor] + paths
+        cwd = expanduser(cwd)
+        command = [self.cmd_path] + [expanduser(path) for path in paths]
         process_result = subprocess.run(command,
                                         cwd=cwd)
         process_returncode = process_result.returncode
@@ -3,8 +3,13 @@ Small git wrapper to init, check status, add, commit and pull
 """
 
 from __future__ import annotations
+import os
 import subprocess
+from stat import S_ISDIR
+from configparser import ConfigParser, Error as ConfigParserError
 from typing import Optional, Any, Protocol
+from collections.abc import Callable
+from functools import cached_property
 from pathlib import Path
 from notepy.wrappers.base_wrapper import BaseWrapper, WrapperException, run_and_handle
 from shutil import rmtree
@@ -25,15 +30,17 @@ class Git(BaseWrapper):
         self.path = Path(path).expanduser()
         self.git_path = self.path / ".git"
         self.branch = branch
+        # values read from .git/config, valid while its mtime is unchanged
+        self._cache: dict[str, tuple[int, Any]] = {}
         self._check_repo()
 
     def _check_repo(self) -> None:
         """
         Check that the directory provided is a git repo.
         """
-        if not self.path.is_dir():
+        if not _is_dir(self.path):
             raise GitException(f"'{self.path}' is not a directory.")
-        if not self.git_path.is_dir():
+        if not _is_dir(self.git_path):
             raise GitException(f"'{self.path}' is not a git repository."
                                "Use `Git.init('path')` to initialize.")
 
@@ -60,17 +67,24 @@ class Git(BaseWrapper):
 
         # create gitignore
         gitignore = path / ".gitignore"
-        gitignore.touch(exist_ok=True)
+        # appending creates the file if needed
         with open(gitignore, "a") as f:
-            for ignored in to_ignore:
-                f.write(ignored+"\n")
+            if to_ignore:
+                f.write("\n".join(to_ignore) + "\n")
 
         # initialize repository
-        process = run_and_handle("git init", exception=GitException, cwd=path)
-        process = run_and_handle("git add .", exception=GitException, cwd=path)
-        process = run_and_handle("git commit -m 'First commit'",
+        process = run_and_handle(["git", "init"], exception=GitException, cwd=path)
+        # remember untracked directories, so that `status`
+        # only rescans the ones that changed
+        process = run_and_handle(["git", "config", "core.untrackedCache", "true"],
                                  exception=GitException,
                                  cwd=path)
+        process = run_and_handle(["git", "add", "."], exception=GitException, cwd=path)
+        # git commit reports its errors on stdout
+        process = run_and_handle(["git", "commit", "-m", "First commit"],
+                                 exception=GitException,
+                                 cwd=path,
+                                 capture=True)
         del process
 
         new_repo = cls(path)
@@ -81,29 +95,48 @@ class Git(BaseWrapper):
         """
         Add changed files to staging area.
         """
-        process = run_and_handle("git add -A",
+        process = run_and_handle([self.cmd_path, "add", "-A"],
                                  exception=GitException,
                                  cwd=self.path)
         del process
 
-    def commit(self, msg: Optional[str] = "commit notes") -> None:
+    def commit(self, msg: Optional[str] = "commit notes", all: bool = False) -> None:
         """
         Commit the staging area.
+
+        :param msg: the commit message.
+        :param all: whether to stage the changes to tracked files first.
         """
-        process = run_and_handle(f"git commit -m '{msg}'",
+        # git commit reports its errors on stdout. The message
+        # is read from stdin, whatever its length or content.
+        process = run_and_handle(_commit_command(self.cmd_path, all),
                                  exception=GitException,
-                                 cwd=self.path)
+                                 cwd=self.path,
+                                 capture=True,
+                                 input=msg.encode("utf-8"))
         del process
 
     def has_changed(self) -> bool:
         """
         Determine if there are changes to commit
         """
-        changed = False
-        if "nothing to commit" not in self.status:
-            changed = True
+        # porcelain output is empty on a clean tree, whatever the locale
+        return bool(self._porcelain())
 
-        return changed
+    def _porcelain(self) -> bytes:
+        """
+        Machine readable status of the repository.
+        """
+        # untracked files are listed whatever status.showUntrackedFiles says,
+        # otherwise `commit -a` would leave new notes out
+        process = run_and_handle([self.cmd_path, "status", "--porcelain=v2", "-z",
+                                  "--untracked-files=all"],
+                                 exception=GitException,
+                                 cwd=self.path,
+                                 env=_read_only_env(),
+                                 capture=True)
+
+        return process.stdout
 
     def push(self) -> None:
         """
@@ -112,7 +145,7 @@ class Git(BaseWrapper):
         if not self._origin_exists():
             raise GitException("""origin does not exist.""")
 
-        process = run_and_handle(f'git push origin {self.branch}',
+        process = run_and_handle([self.cmd_path, "push", "origin", self.branch],
                                  exception=GitException,
                                  cwd=self.path,
                                  comment="Check that origin is correct")
@@ -125,50 +158,114 @@ class Git(BaseWrapper):
         if not self._origin_exists():
             raise GitException("""Origin does not exist.""")
 
-        process = run_and_handle(f'git pull origin {self.branch}',
+        process = run_and_handle([self.cmd_path, "pull", "origin", self.branch],
                                  exception=GitException,
                                  cwd=self.path,
                                  comment="Check that origin is correct")
         del process
 
     def commit_on_change(self, msg: str = "commit notes") -> None:
-        if self.has_changed():
+        status = self._porcelain()
+        if not status:
+            return
+        # `commit -a` stages tracked files itself, only
+        # new files need a separate `add`
+        untracked = _has_untracked(status)
+        if untracked:
             self.add()
-            self.commit(msg)
+        self.commit(msg, all=not untracked)
 
     def save(self, msg: str = "commit notes") -> None:
         self.commit_on_change(msg)
         if self.origin:
             self.push()
 
-    def _origin_exists(self) -> bool:
+    def _cached_config(self, key: str, fn: Callable[[], Any]) -> Any:
         """
-        Check if origin is defined.
+        Return the cached result of `fn`, recomputing it only
+        if `.git/config` has been modified since it was cached.
+
+        :param key: name of the cached value.
+        :param fn: function computing the value.
+        :return: the value.
+        """
+        mtime = os.stat(self.git_path / "config").st_mtime_ns
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        value = fn()
+        self._cache[key] = (mtime, value)
+
+        return value
+
+    def _get_origin(self) -> str | None:
+        """
+        Read the origin URL from the repository's config file,
+        asking git only for what the file format can't express.
+
+        :return: the URL, or None if origin is not defined.
+        """
+        config = ConfigParser(strict=False,
+                              allow_no_value=True,
+                              interpolation=None)
+        try:
+            config.read(self.git_path / "config", encoding="utf-8")
+        except (ConfigParserError, UnicodeDecodeError):
+            return self._get_origin_from_git()
+
+        # included files, and values that may be quoted, escaped or
+        # followed by a comment, are left to git
+        sections = config.sections()
+        if any(section.lower().startswith("include") for section in sections):
+            return self._get_origin_from_git()
+        origin = None
+        for section in sections:
+            # section names are case-insensitive, subsection names are not
+            if _is_origin_section(section) and config.has_option(section, "url"):
+                origin = config.get(section, "url")
+        if origin is not None and any(char in origin for char in '"\\;#'):
+            return self._get_origin_from_git()
+
+        return origin
+
+    def _get_origin_from_git(self) -> str | None:
         """
-        command = ['git', 'config', '--get', 'remote.origin.url']
-        origin = subprocess.run(command,
-                                cwd=self.path,
-                                capture_output=True)
+        Read the origin URL through `git config`.
 
-        origin_exists = True
-        if origin.returncode == 1:  # error code given by this failed action
-            origin_exists = False
-        elif origin.returncode != 0:  # for any other: raise exception
+        :return: the URL, or None if origin is not defined.
+        """
+        command = [self.cmd_path, 'config', '--get', 'remote.origin.url']
+        process = subprocess.run(command,
+                                 cwd=self.path,
+                                 capture_output=True)
+
+        if process.returncode == 1:  # error code given by this failed action
+            return None
+        elif process.returncode != 0:  # for any other: raise exception
             error_message = (f"Command '{' '.join(command)}' returned a non-zero exit status "
-                             f"{origin.returncode}. Below is the full stderr:\n\n"
-                             f"{origin.stdout.decode('utf-8')}")
+                             f"{process.returncode}. Below is the full stderr:\n\n"
+                             f"{process.stdout.decode('utf-8')}")
             raise GitException(error_message)
 
-        return origin_exists
+        return process.stdout.decode('utf-8').strip()
+
+    def _origin_exists(self) -> bool:
+        """
+        Check if origin is defined.
+        """
+        return self._cached_config("origin", self._get_origin) is not None
 
     @property
     def status(self) -> str:
         """
         Check status of current git repo.
         """
-        process = run_and_handle("git status",
+        process = run_and_handle([self.cmd_path, "status"],
                                  exception=GitException,
-                                 cwd=self.path)
+                                 cwd=self.path,
+                                 env=_read_only_env(),
+                                 capture=True)
         status = process.stdout.decode('utf-8')
 
         return status
@@ -186,22 +283,9 @@ class Git(BaseWrapper):
         """
         get origin URL.
         """
-        command = ['git', 'config', '--get', 'remote.origin.url']
-        process = subprocess.run(command,
-                                 cwd=self.path,
-                                 capture_output=True)
+        origin = self._cached_config("origin", self._get_origin)
 
-        if process.returncode == 1:  # error code given by this failed action
-            origin = ""
-        elif process.returncode != 0:  # for any other: raise exception
-            error_message = (f"Command '{' '.join(command)}' returned a non-zero exit status "
-                             f"{process.returncode}. Below is the full stderr:\n\n"
-                             f"{process.stdout.decode('utf-8')}")
-            raise GitException(error_message)
-        else:
-            origin = process.stdout.decode('utf-8').strip()
-
-        return origin
+        return origin if origin is not None else ""
 
     @origin.setter
     def origin(self, value: str) -> None:
@@ -211,11 +295,12 @@ class Git(BaseWrapper):
         :param value: the URL of origin.
         """
         if self._origin_exists():
-            command = f'git remote set-url origin "{value}"'
+            command = [self.cmd_path, "remote", "set-url", "origin", value]
         else:
-            command = f'git remote add origin "{value}"'
+            command = [self.cmd_path, "remote", "add", "origin", value]
 
         process = run_and_handle(command, exception=GitException, cwd=self.path)
+        self._cache.clear()
         del process
 
     @origin.deleter
@@ -226,9 +311,10 @@ class Git(BaseWrapper):
         if not self._origin_exists():
             raise GitException("origin does not exist.")
 
-        process = run_and_handle('git remote remove origin',
+        process = run_and_handle([self.cmd_path, "remote", "remove", "origin"],
                                  exception=GitException,
                                  cwd=self.path)
+        self._cache.clear()
         del process
 
     def __repr__(self) -> str:
@@ -242,6 +328,69 @@ class Git(BaseWrapper):
         return string
 
 
+def _is_dir(path: Path) -> bool:
+    """
+    Same as `Path.is_dir`, with a single `stat` call and
+    without the wrapping of `Path`.
+
+    :param path: the path to check.
+    """
+    try:
+        return S_ISDIR(os.stat(path).st_mode)
+    except (OSError, ValueError):
+        return False
+
+
+def _is_origin_section(section: str) -> bool:
+    """
+    Check whether a section of the git config defines origin,
+    as `[remote "origin"]` or the deprecated `[remote.origin]`.
+
+    :param section: the name of the section.
+    """
+    name, _, subsection = section.partition(" ")
+    if subsection:
+        return name.lower() == "remote" and subsection.strip() == '"origin"'
+
+    return section.lower() == "remote.origin"
+
+
+def _read_only_env() -> dict[str, str]:
+    """
+    Environment of the commands that only read the repository: the current
+    one, without taking the optional index lock to refresh the index, so
+    that they never contend with writes.
+    """
+    return {**os.environ, "GIT_OPTIONAL_LOCKS": "0"}
+
+
+def _commit_command(git: str, all: bool) -> list[str]:
+    """
+    Command committing with the message read from stdin.
+
+    :param git: path of the git executable.
+    :param all: whether to stage the changes to tracked files first.
+    """
+    return [git, "commit", "-a", "-F", "-"] if all else [git, "commit", "-F", "-"]
+
+
+def _has_untracked(status: bytes) -> bool:
+    """
+    Check for untracked files in the output of `git status --porcelain=v2 -z`.
+
+    :param status: the output of the command.
+    """
+    entries = iter(status.split(b"\0"))
+    for entry in entries:
+        if entry.startswith(b"? "):
+            return True
+        # renames and copies are followed by their original path
+        if entry.startswith(b"2 "):
+            next(entries, None)
+
+    return False
+
+
 class GitMixinProtocol(Protocol):
     """
     Protocol class for type-checker
@@ -249,6 +398,9 @@ class GitMixinProtocol(Protocol):
     @property
     def vault(self) -> Path: ...
 
+    @property
+    def _git(self) -> Git | None: ...
+
     def _detect_git_repo(self, path: Path) -> Git | None: ...
 
 
@@ -269,6 +421,7 @@ class GitMixin:
         :return: Git object
         """
         git = Git.init(self.vault, to_ignore=to_ignore)
+        self.__dict__["_git"] = git
 
         return git
 
@@ -276,11 +429,12 @@ class GitMixin:
         """
         Remove repository.
         """
-        if self._detect_git_repo(self.vault):
+        if self._git:
             git_path: Path = self.vault / ".git"
             gitignore_path: Path = self.vault / ".gitignore"
             gitignore_path.unlink(missing_ok=True)
             rmtree(str(git_path))
+            self.__dict__.pop("_git", None)
         else:
             raise GitException(f"'{self.vault}' is not a git repository.")
 
@@ -288,7 +442,7 @@ class GitMixin:
         """
         Show remote origin of a git repo.
         """
-        if (git := self._detect_git_repo(self.vault)):
+        if (git := self._git):
             return git.origin
 
         return None
@@ -299,35 +453,35 @@ class GitMixin:
 
         :param origin: URL of the remote.
         """
-        if (git := self._detect_git_repo(self.vault)):
+        if (git := self._git):
             git.origin = origin
 
     def remove_remote(self: GitMixinProtocol) -> None:
         """
         Delete remote origin from a git repo.
         """
-        if (git := self._detect_git_repo(self.vault)):
+        if (git := self._git):
             del git.origin
 
     def push_remote(self: GitMixinProtocol) -> None:
         """
         Push to remote
         """
-        if (git := self._detect_git_repo(self.vault)):
+        if (git := self._git):
             git.push()
 
     def pull_remote(self: GitMixinProtocol) -> None:
         """
         Push to remote
         """
-        if (git := self._detect_git_repo(self.vault)):
+        if (git := self._git):
             git.pull()
 
     def sync(self: GitMixinProtocol) -> None:
         """
         Synchronize with remote origin.
         """
-        if (git := self._detect_git_repo(self.vault)):
+        if (git := self._git):
             git.commit_on_change("Synchronizing.")
             git.pull()
             git.push()
@@ -339,12 +493,19 @@ class GitMixin:
         """
         Commit and sync
         """
-        if (git := self._detect_git_repo(self.vault)):
+        if (git := self._git):
             if commit:
                 git.commit_on_change(msg)
             if push:
                 git.push()
 
+    @cached_property
+    def _git(self: GitMixinProtocol) -> Git | None:
+        """
+        Git repo of the vault, detected on first use.
+        """
+        return self._detect_git_repo(self.vault)
+
     def _detect_git_repo(self, path: Path) -> Git | None:
         """
         Detect if a directory is also a git repo.
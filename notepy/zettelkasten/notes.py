@@ -3,16 +3,25 @@ Define the main class that models a zettelkasten note.
 """
 
 from __future__ import annotations
-from collections.abc import Collection
+from collections.abc import Callable, Collection, MutableMapping, Sequence
 from typing import Any
 
 from abc import ABC, abstractmethod
 from datetime import datetime
 from dataclasses import dataclass, fields
+from functools import lru_cache
+from operator import attrgetter
 from string import punctuation
 from pathlib import Path
 
-from notepy.parser.parser import HeaderParser, BodyParser
+from notepy.parser.parser import (HeaderParser, BodyParser, NoteParser, parse_paths,
+                                  _DATE_FORMAT)
+
+# fewer notes than this are read in the current process
+_PARALLEL_READ_THRESHOLD = 16
+
+# drop punctuation except dashes, and turn spaces into dashes
+_SLUG_TABLE = str.maketrans(" ", "-", punctuation.replace("-", ""))
 
 
 def sluggify(title: str) -> str:
@@ -22,15 +31,14 @@ def sluggify(title: str) -> str:
     :param title: title to sluggify.
     :return: sluggified title (duh).
     """
-    clean_title = "".join(list(map(lambda x: x
-                                   if x not in punctuation or x == "-"
-                                   else "", title)))
-    slug = clean_title.lower().replace(" ", "-")
+    slug = title.translate(_SLUG_TABLE).lower()
 
     return slug
 
 
 class BaseNote(ABC):
+    __slots__ = ()
+
     @classmethod
     @abstractmethod
     def new(cls, title: str, author: str) -> Note:
@@ -82,7 +90,7 @@ class BaseNote(ABC):
         """
 
 
-@dataclass
+@dataclass(slots=True)
 class Note(BaseNote):
     """
     This class models a single note in a larger zettelkasten system.
@@ -143,18 +151,80 @@ class Note(BaseNote):
         :param link_del: how a link is delimited.
         :return: the note
         """
-        header_parser = HeaderParser(parsing_obj=parsing_obj,
-                                     delimiter=delimiter,
-                                     special_names=special_names)
-        body_parser = BodyParser(header1=header,
-                                 link_del=link_del)
+        note_parser = cls._note_parser(parsing_obj, delimiter, special_names,
+                                       header, link_del)
+
+        # let opening the note fail, rather than checking beforehand
+        try:
+            body_meta, _ = note_parser.parse(path=path)
+        except FileNotFoundError:
+            raise NoteException("Note does not exist. Consider reindexing the vault.")
+
+        return cls._from_parsed(body_meta, header, strict, quiet)
+
+    @classmethod
+    def read_many(cls,
+                  paths: Sequence[str | Path],
+                  parsing_obj: Collection[str],
+                  delimiter: str = "---",
+                  special_names: Collection[str] = ("date", "last", "tags", 'zk_id'),
+                  header: str = "# ",
+                  link_del: tuple[str, str] = ('[[', ']]'),
+                  strict: bool = False,
+                  quiet: bool = False) -> list[Note]:
+        """
+        Read many notes, parsing them in parallel
+        when there are enough of them.
 
-        if not Path(path).exists():
+        :param paths: paths to the notes.
+        :param parsing_obj: what names to parse in the frontmatter.
+        :param delimiter: delimiter of the frontmatter.
+        :param special_names: names of the frontmatter that need to be specially parsed.
+        :param header: how a header is defined.
+        :param link_del: how a link is delimited.
+        :return: the notes, in the same order as paths.
+        """
+        note_parser = cls._note_parser(parsing_obj, delimiter, special_names,
+                                       header, link_del)
+
+        # starting the worker processes costs more than parsing a few notes
+        if len(paths) < _PARALLEL_READ_THRESHOLD:
+            parsed_notes = (note_parser.parse(path=path)[0] for path in paths)
+        else:
+            parsed_notes = parse_paths(paths, note_parser)
+
+        # notes are parsed while iterating, in either case
+        try:
+            return [cls._from_parsed(body_meta, header, strict, quiet)
+                    for body_meta in parsed_notes]
+        except FileNotFoundError:
             raise NoteException("Note does not exist. Consider reindexing the vault.")
 
-        with open(path) as f:
-            frontmatter_meta, _ = header_parser.parse(handle=f)
-            body_meta, _ = body_parser.parse(handle=f)
+    @staticmethod
+    def _note_parser(parsing_obj: Collection[str],
+                     delimiter: str,
+                     special_names: Collection[str],
+                     header: str,
+                     link_del: tuple[str, str]) -> NoteParser:
+        """
+        Get the parser of a note, shared by the notes with the same configuration.
+        """
+        return _cached_note_parser(tuple(parsing_obj), delimiter, tuple(special_names),
+                                   header, tuple(link_del))
+
+    @staticmethod
+    def _from_parsed(body_meta: MutableMapping[str, Any],
+                     header: str,
+                     strict: bool,
+                     quiet: bool) -> Note:
+        """
+        Build a note from the output of its parser.
+
+        :param body_meta: the parsed note.
+        :param header: how a header is defined.
+        :return: the note
+        """
+        frontmatter_meta = body_meta['frontmatter']
 
         # raise exception if first header is different from title
         if not quiet:
@@ -177,12 +247,7 @@ class Note(BaseNote):
         Return content of note
         """
 
-        note = self.generate_frontmatter()
-        note += "\n\n\n"
-        note += self.body
-        note += "\n"
-
-        return note
+        return f"{self.generate_frontmatter()}\n\n\n{self.body}\n"
 
     def sluggify(self) -> str:
         """
@@ -201,19 +266,10 @@ class Note(BaseNote):
         :return: the frontmatter string
         """
 
-        frontmatter_names = [note_field.name
-                             for note_field in fields(Note)
-                             if note_field.name not in ['links', 'body']]
-        frontmatter_metadata = {name: getattr(self, name) for name in frontmatter_names}
-        frontmatter_metadata['tags'] = " ".join(frontmatter_metadata['tags'])
-        frontmatter_metadata['date'] = (frontmatter_metadata['date']
-                                        .strftime("%Y-%m-%dT%H:%M:%S"))
-        frontmatter_metadata['last'] = (frontmatter_metadata['last']
-                                        .strftime("%Y-%m-%dT%H:%M:%S"))
-        yml_header = '\n'.join(
-                ['---'] +
-                [f'{key}: {el}' for key, el in frontmatter_metadata.items()] +
-                ['---'])
+        fields_lines = '\n'.join([prefix + format_value(value)
+                                  for (prefix, format_value), value
+                                  in zip(_FRONTMATTER_LINES, _get_frontmatter_values(self))])
+        yml_header = f'---\n{fields_lines}\n---'
 
         return yml_header
 
@@ -251,10 +307,53 @@ class Note(BaseNote):
         :return: the note ID
         """
 
-        date_formatted = int(date.strftime("%Y%m%d%H%M%S"))
+        # same as int(date.strftime("%Y%m%d%H%M%S")), without
+        # going through the format string and the int parsing
+        date_formatted = date.year
+        for value in (date.month, date.day, date.hour, date.minute, date.second):
+            date_formatted = date_formatted * 100 + value
 
         return date_formatted
 
 
+# names of the fields written in the frontmatter, and getter of their values
+_FRONTMATTER_FIELDS = tuple(note_field.name
+                            for note_field in fields(Note)
+                            if note_field.name not in ('links', 'body'))
+_get_frontmatter_values = attrgetter(*_FRONTMATTER_FIELDS)
+
+
+def _format_date(date: datetime) -> str:
+    return date.strftime(_DATE_FORMAT)
+
+
+# how values are written in the frontmatter, str() unless listed
+_FRONTMATTER_FORMATTERS: dict[str, Callable[[Any], str]] = {
+    'tags': " ".join,
+    'date': _format_date,
+    'last': _format_date,
+}
+# prefix and formatter of each line of the frontmatter, in order
+_FRONTMATTER_LINES = tuple((f"{name}: ", _FRONTMATTER_FORMATTERS.get(name, str))
+                           for name in _FRONTMATTER_FIELDS)
+
+
+@lru_cache(maxsize=8)
+def _cached_note_parser(parsing_obj: tuple[str, ...],
+                        delimiter: str,
+                        special_names: tuple[str, ...],
+                        header: str,
+                        link_del: tuple[str, ...]) -> NoteParser:
+    """
+    Build the parser of a note. The parsers keep no state
+    between notes, so one is built per configuration.
+    """
+    return NoteParser(HeaderParser(parsing_obj=parsing_obj,
+                                   delimiter=delimiter,
+                                   special_names=special_names),
+                      BodyParser(header1=header,
+                                 link_del=link_del))
+
+
 class NoteException(Exception):
     """Exception raised when there is an issue with a note."""
@@ -4,10 +4,11 @@ SQLite statements to manage index
 
 import sqlite3
 from datetime import datetime
-from collections.abc import Sequence
+from collections.abc import Iterable, Sequence
+from functools import cached_property, lru_cache
 from pathlib import Path
 
-from typing import Optional
+from typing import Any, Optional
 
 from notepy.zettelkasten.notes import Note, sluggify
 
@@ -36,9 +37,32 @@ _CREATE_LINKS_TABLE_STMT = """
         ON UPDATE CASCADE
         ON DELETE CASCADE)
 """
+# trigram index of the titles, so that `title LIKE '%...%'`
+# filters don't scan the whole table. Kept in sync by triggers.
+_CREATE_TITLES_INDEX_STMT = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS titles_fts
+    USING fts5(title, content=zettelkasten, content_rowid=rowid, tokenize=trigram)
+"""
+_CREATE_TITLES_TRIGGERS_STMT = """
+    CREATE TRIGGER IF NOT EXISTS titles_fts_insert AFTER INSERT ON zettelkasten BEGIN
+        INSERT INTO titles_fts(rowid, title) VALUES (new.rowid, new.title);
+    END;
+    CREATE TRIGGER IF NOT EXISTS titles_fts_delete AFTER DELETE ON zettelkasten BEGIN
+        INSERT INTO titles_fts(titles_fts, rowid, title) VALUES ('delete', old.rowid, old.title);
+    END;
+    CREATE TRIGGER IF NOT EXISTS titles_fts_update AFTER UPDATE OF title ON zettelkasten BEGIN
+        INSERT INTO titles_fts(titles_fts, rowid, title) VALUES ('delete', old.rowid, old.title);
+        INSERT INTO titles_fts(rowid, title) VALUES (new.rowid, new.title);
+    END;
+"""
+_HAS_TITLES_INDEX_STMT = "SELECT 1 FROM sqlite_master WHERE name = 'titles_fts'"
+_TITLE_MATCH_QUERY = """zk_id IN (SELECT zk_id FROM zettelkasten WHERE rowid IN
+    (SELECT rowid FROM titles_fts WHERE title LIKE ?))"""
 _DROP_MAIN_TABLE_STMT = "DROP TABLE IF EXISTS zettelkasten;"
+_DROP_TITLES_INDEX_STMT = "DROP TABLE IF EXISTS titles_fts;"
 _DROP_TAGS_TABLE_STMT = "DROP TABLE IF EXISTS tags;"
 _DROP_LINKS_TABLE_STMT = "DROP TABLE IF EXISTS links;"
+_FOREIGN_KEYS_STMT = "PRAGMA foreign_keys = ON"
 _INSERT_MAIN_STMT = "INSERT INTO zettelkasten VALUES (?, ?, ?, ?, ?)"
 _INSERT_TAGS_STMT = "INSERT INTO tags VALUES (?, ?)"
 _INSERT_LINKS_STMT = "INSERT INTO links VALUES (?, ?)"
@@ -54,6 +78,7 @@ _UPDATE_MAIN_STMT = """
 """
 _LIST_STMT = "SELECT zk_id, title FROM zettelkasten;"
 _GET_LINKS_ID = "SELECT link FROM links WHERE zk_id = ?;"
+_LIST_QUERIES_CACHE_SIZE = 32
 
 _JOINED_ALL = """
     (SELECT *
@@ -63,35 +88,91 @@ _JOINED_ALL = """
         ) tmp
         LEFT JOIN links ON tmp.zk_id = links.zk_id)
 """
+# tables of the columns not in the main table
+_JOINED_TABLES = {'tag': 'tags', 'link': 'links'}
+# a note matches when any of its tags (links) satisfies the condition
+_EXISTS_QUERY = """EXISTS (SELECT 1 FROM {table}
+    WHERE {table}.zk_id = zettelkasten.zk_id AND {condition})"""
 
 
 class DBManager:
     """
     Database manager for the index of a zettelkasten.
 
-    :param connection: the connection to the index
+    :param index: path to the index
     """
 
     def __init__(self, index: Path) -> None:
         self.index = index
+        # whether the index has the titles_fts table, checked on first use
+        self._titles_index: Optional[bool] = None
+
+    @cached_property
+    def _conn(self) -> sqlite3.Connection:
+        """
+        Connection to the index, opened on first use and kept
+        for the lifetime of the manager. Operations may run in
+        the spinner's worker thread, one at a time.
+        """
+        conn = sqlite3.connect(self.index, check_same_thread=False)
+        # deleting a note cascades to its tags and links
+        conn.execute(_FOREIGN_KEYS_STMT)
+
+        return conn
+
+    def close(self) -> None:
+        """
+        Close the connection to the index, if it was opened.
+        """
+        conn = self.__dict__.pop("_conn", None)
+        if conn is not None:
+            conn.close()
+
+    def __enter__(self) -> "DBManager":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __getstate__(self) -> dict[str, Any]:
+        # connections cannot be pickled: without this, sending the vault
+        # to the workers of delete_multiple's Pool fails. Each worker
+        # opens its own connection on first use instead.
+        state = self.__dict__.copy()
+        state.pop("_conn", None)
+
+        return state
 
     def create_tables(self) -> None:
         """
         Create the index for a newly initialized zk.
         """
-        with sqlite3.connect(self.index) as conn:
+        with self._conn as conn:
             conn.execute(_CREATE_MAIN_TABLE_STMT)
             conn.execute(_CREATE_TAGS_TABLE_STMT)
             conn.execute(_CREATE_LINKS_TABLE_STMT)
+            try:
+                conn.execute(_CREATE_TITLES_INDEX_STMT)
+                conn.executescript(_CREATE_TITLES_TRIGGERS_STMT)
+            except sqlite3.OperationalError:
+                # SQLite built without FTS5 or the trigram tokenizer:
+                # titles are filtered by scanning instead.
+                pass
+        self._titles_index = None
 
     def drop_tables(self) -> None:
         """
         Drop all the tables.
         """
-        with sqlite3.connect(self.index) as conn:
-            conn.execute(_DROP_MAIN_TABLE_STMT)
+        with self._conn as conn:
+            try:
+                conn.execute(_DROP_TITLES_INDEX_STMT)
+            except sqlite3.OperationalError:
+                pass
+            # children first, or dropping the notes deletes their rows
             conn.execute(_DROP_TAGS_TABLE_STMT)
             conn.execute(_DROP_LINKS_TABLE_STMT)
+            conn.execute(_DROP_MAIN_TABLE_STMT)
 
     def update_note_to_index(self, note: Note) -> None:
         """
@@ -107,7 +188,7 @@ class DBManager:
         links_payload = [(link, note.zk_id) for link in note.links]
 
         try:
-            with sqlite3.connect(self.index) as conn:
+            with self._conn as conn:
                 conn.execute(_UPDATE_MAIN_STMT, main_payload)
                 # update tags and links
                 conn.execute(_DELETE_TAGS_STMT, (note.zk_id,))
@@ -125,17 +206,29 @@ class DBManager:
 
         :param note: note to process.
         """
-        main_payload = (note.zk_id,
-                        note.title,
-                        note.author,
-                        note.date,
-                        note.last)
-        tags_payload = [(tag, note.zk_id) for tag in note.tags]
-        links_payload = [(link, note.zk_id) for link in note.links]
+        self.add_many_to_index((note,))
+
+    def add_many_to_index(self, notes: Iterable[Note]) -> None:
+        """
+        Add new notes to the vault, in a single transaction.
+
+        :param notes: notes to process.
+        """
+        main_payload = []
+        tags_payload = []
+        links_payload = []
+        for note in notes:
+            main_payload.append((note.zk_id,
+                                 note.title,
+                                 note.author,
+                                 note.date,
+                                 note.last))
+            tags_payload.extend((tag, note.zk_id) for tag in note.tags)
+            links_payload.extend((link, note.zk_id) for link in note.links)
 
         try:
-            with sqlite3.connect(self.index) as conn:
-                conn.execute(_INSERT_MAIN_STMT, main_payload)
+            with self._conn as conn:
+                conn.executemany(_INSERT_MAIN_STMT, main_payload)
                 conn.executemany(_INSERT_TAGS_STMT, tags_payload)
                 conn.executemany(_INSERT_LINKS_STMT, links_payload)
         except sqlite3.IntegrityError as e:
@@ -148,13 +241,11 @@ class DBManager:
         :param note: note to delete.
         """
         try:
-            with sqlite3.connect(self.index) as conn:
+            with self._conn as conn:
                 conn.execute(_DELETE_MAIN_STMT, (zk_id,))
         except sqlite3.IntegrityError as e:
             raise DBManagerException("SQL error") from e
 
-    # TODO: needs improvements in performance. Maybe don't build
-    # a huge join but build incrementally?
     def list_notes(self,
                    title: Optional[list[str]] = None,
                    zk_id: Optional[list[str]] = None,
@@ -168,33 +259,30 @@ class DBManager:
                    show: list[str] = ['title', 'zk_id']) -> Sequence[tuple[int, str]]:
         """
         """
-        query: str = _JOINED_ALL
         payload = []
-        select_cols = "SELECT DISTINCT " + ", ".join(f"{col}" for col in show) + " FROM "
-
-        columns_query = []
+        columns_conditions = []
+        titles_index = title is not None and self._has_titles_index()
         for col in ['title', 'zk_id', 'author', 'tag', 'link']:
             local_col = locals()[col]
             if local_col is not None:
-                col_query = " OR ".join(f"{col} LIKE ?"
-                                        if not el.startswith("!")
-                                        else f"{col} NOT LIKE ?"
-                                        for el in local_col
-                                        )
-                payload.extend([el.removeprefix("!") for el in local_col])
-                columns_query.append(col_query)
-        where_query = " AND ".join(columns_query)
-        where_query = "WHERE " + where_query if where_query else ""
-
-        ascending_query = "DESC" if descending else "ASC"
-        sort_query = ""
-        if sort_by is not None:
-            sort_query = f"\nORDER BY {sort_by} {ascending_query}"
-
-        query = select_cols + query + where_query + sort_query
+                conditions = []
+                for el in local_col:
+                    negated = el.startswith("!")
+                    pattern = el.removeprefix("!")
+                    if col == 'title':
+                        condition, pattern = _title_condition(pattern,
+                                                              negated,
+                                                              titles_index)
+                    else:
+                        condition = f"{col} NOT LIKE ?" if negated else f"{col} LIKE ?"
+                    conditions.append(condition)
+                    payload.append(pattern)
+                columns_conditions.append((col, tuple(conditions)))
+
+        query = _list_query(tuple(show), tuple(columns_conditions), sort_by, descending)
 
         try:
-            with sqlite3.connect(self.index) as conn:
+            with self._conn as conn:
                 cur = conn.cursor()
                 results = cur.execute(query, tuple(payload)).fetchall()
                 cur.close()
@@ -204,8 +292,23 @@ class DBManager:
 
         return results
 
+    def _has_titles_index(self) -> bool:
+        """
+        Check whether the index has the trigram index of the titles.
+        Indexes created by older versions don't have it until reindexed.
+        """
+        if self._titles_index is None:
+            try:
+                with self._conn as conn:
+                    found = conn.execute(_HAS_TITLES_INDEX_STMT).fetchone()
+                self._titles_index = found is not None
+            except sqlite3.Error:
+                return False
+
+        return self._titles_index
+
     def get_title(self) -> Sequence[str]:
-        with sqlite3.connect(self.index) as conn:
+        with self._conn as conn:
             results = conn.execute("select title from zettelkasten;").fetchall()
 
         return results
@@ -216,11 +319,95 @@ class DBManager:
 
         :param zk_id: the ID.
         """
-        with sqlite3.connect(self.index) as conn:
-            results = conn.execute(_GET_LINKS_ID).fetchall()
+        with self._conn as conn:
+            results = conn.execute(_GET_LINKS_ID, (zk_id,)).fetchall()
 
         return results
 
 
+@lru_cache(maxsize=_LIST_QUERIES_CACHE_SIZE)
+def _list_query(show: tuple[str, ...],
+                columns_conditions: tuple[tuple[str, tuple[str, ...]], ...],
+                sort_by: Optional[str],
+                descending: bool) -> str:
+    """
+    Build the query listing notes. Repeated searches, like the ones
+    of the interactive selection, only change the parameters.
+
+    Tags and links are only joined when they are shown or sorted by,
+    otherwise filtering on them is a semi-join on each note.
+
+    :param show: columns to select.
+    :param columns_conditions: each filtered column, with its conditions.
+    :param sort_by: column to sort by, if any.
+    :param descending: whether to sort in descending order.
+    :return: the query.
+    """
+    select_cols = "SELECT DISTINCT " + ", ".join(f"{col}" for col in show) + " FROM "
+    joined = not _JOINED_TABLES.keys().isdisjoint((*show, sort_by))
+
+    # a note must match one of the conditions of each filtered column
+    columns_query = []
+    for col, conditions in columns_conditions:
+        condition = " OR ".join(conditions)
+        if col in _JOINED_TABLES and not joined:
+            condition = _EXISTS_QUERY.format(table=_JOINED_TABLES[col],
+                                             condition=f"({condition})")
+        columns_query.append(f"({condition})")
+    where_query = " AND ".join(columns_query)
+    where_query = "\nWHERE " + where_query if where_query else ""
+
+    ascending_query = "DESC" if descending else "ASC"
+    sort_query = ""
+    if sort_by is not None:
+        sort_query = f"\nORDER BY {sort_by} {ascending_query}"
+    elif not joined and "zk_id" in show:
+        # the join was scanned by id when listing ids, and in the
+        # order notes were indexed otherwise, like the table alone
+        sort_query = "\nORDER BY zk_id"
+
+    return (select_cols + (_JOINED_ALL if joined else "zettelkasten")
+            + where_query + sort_query)
+
+
+def _contained_text(pattern: str) -> Optional[str]:
+    """
+    Detect LIKE patterns of the form `%text%` without other wildcards,
+    which only check that the text is contained.
+
+    :param pattern: the LIKE pattern.
+    :return: the contained text, or None for any other pattern.
+    """
+    if len(pattern) >= 2 and pattern[0] == pattern[-1] == "%":
+        text = pattern[1:-1]
+        if "%" not in text and "_" not in text:
+            return text
+
+    return None
+
+
+def _title_condition(pattern: str,
+                     negated: bool,
+                     titles_index: bool) -> tuple[str, str]:
+    """
+    Build the condition filtering titles on a LIKE pattern.
+
+    :param pattern: the LIKE pattern.
+    :param negated: whether titles must not match the pattern.
+    :param titles_index: whether the trigram index of the titles exists.
+    :return: the condition and its parameter.
+    """
+    if titles_index and not negated:
+        return _TITLE_MATCH_QUERY, pattern
+
+    # plain substring search, without pattern matching. lower()
+    # folds ASCII letters only, exactly like LIKE does.
+    if (text := _contained_text(pattern)) is not None:
+        comparison = "= 0" if negated else "> 0"
+        return f"instr(lower(title), lower(?)) {comparison}", text
+
+    return ("title NOT LIKE ?" if negated else "title LIKE ?"), pattern
+
+
 class DBManagerException(Exception):
     """Errors related to the index database"""
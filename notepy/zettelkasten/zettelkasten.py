@@ -49,7 +49,7 @@ class Zettelkasten(GitMixin):
         self.index = self.vault / ".index.db"
         self.last = self.vault / ".last"
         self.dbmanager = DBManager(self.index)
-        self.git = self._detect_git_repo(self.vault)
+        self.git = self._git
         self.tmp = self.vault / ".tmp"
         self.header_obj = [note_field.name
                            for note_field in fields(self.note_obj)
@@ -101,7 +101,8 @@ class Zettelkasten(GitMixin):
 
         # create the tables
         index = path / ".index.db"
-        DBManager(index).create_tables()
+        with DBManager(index) as dbmanager:
+            dbmanager.create_tables()
 
         # create tmp dir
         tmp = path / '.tmp'
@@ -499,33 +500,14 @@ class Zettelkasten(GitMixin):
         self.dbmanager.create_tables()
 
         # index all the notes
-        for note_path in notes_paths:
-            full_path = self.vault / note_path
-            note = self.note_obj.read(path=full_path,
-                                      parsing_obj=self.header_obj,
-                                      delimiter=self.delimiter,
-                                      special_names=self.special_values,
-                                      header=self.header,
-                                      link_del=self.link_del)
-            self.dbmanager.add_to_index(note)
-
-    def _read_note(self, note_path: str) -> Note:
-        """
-        Utility function for multi core vault reindexing.
-        It reads the content of a note given its path.
-
-        :param note_path: path to the note to read.
-        :return: the note object.
-        """
-        full_path = self.vault / note_path
-        note = self.note_obj.read(path=full_path,
-                                  parsing_obj=self.header_obj,
-                                  delimiter=self.delimiter,
-                                  special_names=self.special_values,
-                                  header=self.header,
-                                  link_del=self.link_del)
-
-        return note
+        notes = (self.note_obj.read(path=self.vault / note_path,
+                                    parsing_obj=self.header_obj,
+                                    delimiter=self.delimiter,
+                                    special_names=self.special_values,
+                                    header=self.header,
+                                    link_del=self.link_del)
+                 for note_path in notes_paths)
+        self.dbmanager.add_many_to_index(notes)
 
     def multiprocess_index_vault(self) -> None:
         """
@@ -540,11 +522,15 @@ class Zettelkasten(GitMixin):
         # create new tables
         self.dbmanager.create_tables()
 
-        with Pool() as executor:
-            notes = executor.map(self._read_note, notes_paths)
+        notes = self.note_obj.read_many([self.vault / note_path
+                                         for note_path in notes_paths],
+                                        parsing_obj=self.header_obj,
+                                        delimiter=self.delimiter,
+                                        special_names=self.special_values,
+                                        header=self.header,
+                                        link_del=self.link_del)
 
-        for note in notes:
-            self.dbmanager.add_to_index(note)
+        self.dbmanager.add_many_to_index(notes)
 
     def get_last(self) -> int:
         """
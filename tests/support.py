@@ -0,0 +1,27 @@
+"""
+Helpers shared by the tests.
+"""
+
+from datetime import datetime
+from pathlib import Path
+
+from notepy.zettelkasten.notes import Note
+
+
+def write_notes(directory, count):
+    paths = []
+    for i in range(count):
+        date = datetime(2023, 10, 19, 19, 30, i)
+        note = Note(title=f"Note {i}",
+                    author="Anonymous",
+                    date=date,
+                    last=date,
+                    zk_id=Note._generate_id(date),
+                    tags=[f"#tag{i}", "#all"],
+                    links=[],
+                    body=f"# Note {i}\n\nSee [[note-{i + 1}]] and [[note-{i - 1}]].")
+        path = Path(directory) / f"{note.zk_id}.md"
+        path.write_text(note.materialize())
+        paths.append(path)
+
+    return paths
@@ -0,0 +1,112 @@
+import unittest
+from argparse import Namespace
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
+from pathlib import Path
+
+from notepy.cli.cli import (Cli, SubcommandsMixin, _report_errors, _note_errors,
+                            _editor_errors, _index_errors)
+from notepy.cli.cli_config import _COMMANDS
+from notepy.wrappers.editor_wrapper import EditorException
+from notepy.zettelkasten.notes import NoteException
+from notepy.zettelkasten.sql import DBManagerException
+from notepy.zettelkasten.zettelkasten import TitleClashError
+
+
+def _raising(exception: Exception):
+    def handler(args: Namespace) -> None:
+        raise exception
+
+    return handler
+
+
+class TestReportErrors(unittest.TestCase):
+    def assertReported(self, handled_errors, exception):
+        output = StringIO()
+        with redirect_stdout(output):
+            _report_errors(handled_errors)(_raising(exception))(Namespace())
+        self.assertEqual(output.getvalue(), f"{exception}\n")
+
+    def test_note_errors(self):
+        """
+        Subcommands writing notes report note, editor and vault errors
+        """
+        self.assertReported(_note_errors, NoteException("note"))
+        self.assertReported(_note_errors, EditorException("editor"))
+        self.assertReported(_note_errors, TitleClashError("title"))
+
+    def test_editor_errors(self):
+        """
+        open does not report note errors
+        """
+        self.assertReported(_editor_errors, EditorException("editor"))
+        with self.assertRaises(NoteException):
+            _report_errors(_editor_errors)(_raising(NoteException("note")))(Namespace())
+
+    def test_index_errors(self):
+        """
+        list reports index errors, and not editor errors
+        """
+        self.assertReported(_index_errors, DBManagerException("index"))
+        with self.assertRaises(EditorException):
+            _report_errors(_index_errors)(_raising(EditorException("editor")))(Namespace())
+
+
+class TestParse(unittest.TestCase):
+    def setUp(self):
+        self.cli = Cli(prog="notepy", description="Zettelkasten manager", **_COMMANDS)
+
+    def parse_exit(self, args):
+        """
+        Parse arguments that make the parser exit.
+
+        :return: exit code, standard output and standard error.
+        """
+        stdout, stderr = StringIO(), StringIO()
+        with redirect_stdout(stdout), redirect_stderr(stderr),\
+                self.assertRaises(SystemExit) as cm:
+            self.cli.parse(args)
+        return cm.exception.code, stdout.getvalue(), stderr.getvalue()
+
+    def test_help(self):
+        """
+        The top-level help lists every subcommand with its help
+        """
+        code, stdout, _ = self.parse_exit(["--help"])
+        self.assertEqual(code, 0)
+        # help strings may be wrapped
+        stdout = " ".join(stdout.split())
+        for command, config in _COMMANDS.items():
+            if command.startswith("command_"):
+                self.assertIn(f"{command.removeprefix('command_')} {config['help']}", stdout)
+
+    def test_subcommand_help(self):
+        code, stdout, _ = self.parse_exit(["new", "--help"])
+        self.assertEqual(code, 0)
+        self.assertIn("usage: notepy new", stdout)
+        self.assertIn("--no-confirmation", stdout)
+        self.assertIn("Title of the new note.", stdout)
+
+    def test_invalid_subcommand(self):
+        code, _, stderr = self.parse_exit(["nope"])
+        self.assertEqual(code, 2)
+        self.assertIn("invalid choice: 'nope'", stderr)
+
+    def test_parse(self):
+        args = self.cli.parse(["--vault", "/tmp/vault", "new", "title", "--strict"])
+        self.assertEqual(args.title, ["title"])
+        self.assertTrue(args.strict)
+        self.assertTrue(args.no_confirmation)
+        self.assertEqual(args.vault, Path("/tmp/vault"))
+        self.assertIs(args.func, SubcommandsMixin.new)
+
+    def test_parse_twice(self):
+        """
+        The flags of a subcommand are added only once
+        """
+        self.cli.parse(["edit", "1"])
+        self.assertEqual(self.cli.parse(["edit", "2"]).zk_id, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,193 @@
+import os
+import subprocess
+import unittest
+from pathlib import Path
+from shutil import which
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from notepy.wrappers.git_wrapper import (Git, GitException, _has_untracked,
+                                         _read_only_env)
+
+
+_GIT_ENV = {"GIT_AUTHOR_NAME": "Test",
+            "GIT_AUTHOR_EMAIL": "test@example.com",
+            "GIT_COMMITTER_NAME": "Test",
+            "GIT_COMMITTER_EMAIL": "test@example.com",
+            "GIT_CONFIG_GLOBAL": os.devnull,
+            "GIT_CONFIG_NOSYSTEM": "1"}
+
+
+@unittest.skipUnless(which("git"), "git is not installed")
+class GitTestCase(unittest.TestCase):
+    def setUp(self):
+        env = patch.dict(os.environ, _GIT_ENV)
+        env.start()
+        self.addCleanup(env.stop)
+        tmp = TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name)
+        subprocess.run(["git", "init", "-q"], cwd=self.path, check=True)
+        self.git = Git(self.path)
+
+    def git_output(self, *args: str) -> str:
+        return subprocess.run(["git", *args], cwd=self.path, check=True,
+                              capture_output=True, text=True).stdout
+
+
+class TestStatus(GitTestCase):
+    def test_read_only_env(self):
+        """
+        Status runs in the current environment, without optional locks
+        """
+        env = _read_only_env()
+        self.assertEqual(env["GIT_CONFIG_GLOBAL"], os.devnull)
+        self.assertEqual(env["GIT_OPTIONAL_LOCKS"], "0")
+
+    def test_status_sees_environment(self):
+        with patch.dict(os.environ, {"GIT_DIR": str(self.path / "missing")}):
+            with self.assertRaises(GitException):
+                self.git._porcelain()
+
+
+class TestOrigin(GitTestCase):
+    def write_config(self, config: str) -> None:
+        with open(self.path / ".git" / "config", "a") as f:
+            f.write(config)
+
+    def assertOrigin(self, origin):
+        self.assertEqual(self.git._get_origin(), origin)
+        self.assertEqual(self.git._get_origin_from_git(), origin)
+
+    def test_no_origin(self):
+        self.assertOrigin(None)
+
+    def test_origin(self):
+        self.write_config('[remote "origin"]\n\turl = https://example.com/x.git\n')
+        self.assertOrigin("https://example.com/x.git")
+
+    def test_inline_comment(self):
+        """
+        Comments after the value are not part of the URL
+        """
+        self.write_config('[remote "origin"]\n\turl = https://example.com/x.git ; old\n')
+        self.assertOrigin("https://example.com/x.git")
+        self.write_config('\turl = https://example.com/y.git # new\n')
+        self.assertOrigin("https://example.com/y.git")
+
+    def test_section_case(self):
+        """
+        Section names are case-insensitive, subsection names are not
+        """
+        self.write_config('[Remote "origin"]\n\tURL = https://example.com/x.git\n')
+        self.assertOrigin("https://example.com/x.git")
+        self.write_config('[remote "Origin"]\n\turl = https://example.com/y.git\n')
+        self.assertOrigin("https://example.com/x.git")
+
+
+class TestCommit(GitTestCase):
+    def setUp(self):
+        super().setUp()
+        (self.path / "note.md").write_text("note\n")
+        subprocess.run(["git", "add", "note.md"], cwd=self.path, check=True)
+
+    def test_message_from_stdin(self):
+        """
+        The message is passed as is, whatever it looks like
+        """
+        msg = "-n --amend \"quoted\" $HOME `ls`\n\nnon-ascii: è ✓"
+        self.git.commit(msg)
+        self.assertEqual(self.git_output("log", "-1", "--format=%B").strip(), msg)
+
+    def test_commit_all(self):
+        self.git.commit("first")
+        (self.path / "note.md").write_text("changed\n")
+        self.git.commit("second", all=True)
+        self.assertEqual(self.git_output("status", "--porcelain"), "")
+
+    def test_commit_fails(self):
+        self.git.commit("first")
+        with self.assertRaises(GitException):
+            self.git.commit("nothing to commit")
+
+
+class TestCommitOnChange(GitTestCase):
+    def setUp(self):
+        super().setUp()
+        (self.path / "note.md").write_text("note\n")
+        self.git.commit_on_change("first")
+        add = patch.object(Git, "add", autospec=True, side_effect=Git.add)
+        self.add = add.start()
+        self.addCleanup(add.stop)
+
+    def test_unchanged(self):
+        self.git.commit_on_change("second")
+        self.add.assert_not_called()
+        self.assertEqual(self.git_output("log", "--format=%s"), "first\n")
+
+    def test_tracked_only(self):
+        """
+        Changes to tracked files are committed without `git add`
+        """
+        (self.path / "note.md").write_text("changed\n")
+        subprocess.run(["git", "mv", "note.md", "renamed.md"], cwd=self.path, check=True)
+        self.git.commit_on_change("second")
+        self.add.assert_not_called()
+        self.assertEqual(self.git_output("status", "--porcelain"), "")
+
+    def test_untracked(self):
+        (self.path / "note.md").write_text("changed\n")
+        (self.path / "new.md").write_text("new\n")
+        self.git.commit_on_change("second")
+        self.add.assert_called_once()
+        self.assertEqual(self.git_output("status", "--porcelain"), "")
+        self.assertIn("new.md", self.git_output("ls-files"))
+
+    def test_untracked_hidden_by_config(self):
+        """
+        New notes are committed even if status hides untracked files
+        """
+        self.git_output("config", "status.showUntrackedFiles", "no")
+        self.test_untracked()
+
+    def test_has_untracked(self):
+        """
+        Paths of renames can't be mistaken for entries
+        """
+        self.assertFalse(_has_untracked(b""))
+        self.assertTrue(_has_untracked(b"? new.md\0"))
+        self.assertFalse(_has_untracked(b"2 R. N... 100644 100644 100644 a b R100 x.md\0? y.md\0"))
+        self.assertTrue(_has_untracked(b"1 .M N... 100644 100644 100644 a b x.md\0? y.md\0"))
+
+
+class TestSave(GitTestCase):
+    def setUp(self):
+        super().setUp()
+        (self.path / "note.md").write_text("note\n")
+
+    def test_save_without_origin(self):
+        """
+        Without origin, save commits and skips the push
+        """
+        self.git.save("first")
+        self.assertEqual(self.git_output("log", "--format=%s"), "first\n")
+
+    def test_save_with_origin(self):
+        with TemporaryDirectory() as remote:
+            subprocess.run(["git", "init", "-q", "--bare", remote], check=True)
+            self.git.branch = self.git_output("symbolic-ref", "--short", "HEAD").strip()
+            self.git.origin = remote
+            self.git.save("first")
+            pushed = subprocess.run(["git", "log", "--format=%s", self.git.branch],
+                                    cwd=remote, check=True,
+                                    capture_output=True, text=True).stdout
+        self.assertEqual(pushed, "first\n")
+
+    def test_save_unchanged(self):
+        self.git.save("first")
+        self.git.save("second")
+        self.assertEqual(self.git_output("log", "--format=%s"), "first\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,177 @@
+import curses
+import unittest
+from unittest.mock import patch
+
+from notepy.cli import interactive_selection
+from notepy.cli.interactive_selection import DEBOUNCE_DELAY, Interactive, OddKeys
+
+
+LINES = 10
+COLS = 40
+
+
+class FakeWindow:
+    """
+    Window drawing on a grid of characters, reading keys from a list.
+    curses.ERR stands for a pause in the typing, long enough for
+    the reads that wait.
+    """
+
+    def __init__(self, keys):
+        self.keys = list(keys)
+        self.delay = -1
+        # delay of each read that waited for a key
+        self.waits = []
+        self.screen = [[" "] * COLS for _ in range(LINES)]
+
+    def getch(self):
+        if self.delay != 0:
+            self.waits.append(self.delay)
+            # a blocking read sleeps through the pauses
+            while self.delay < 0 and self.keys and self.keys[0] == curses.ERR:
+                self.keys.pop(0)
+        if not self.keys:
+            return OddKeys.ESCAPE
+        if self.keys[0] == curses.ERR and self.delay == 0:
+            return curses.ERR
+
+        return self.keys.pop(0)
+
+    def ungetch(self, c):
+        self.keys.insert(0, c)
+
+    def addstr(self, y, x, text, attr=0):
+        self.addnstr(y, x, text, COLS - x, attr)
+
+    def addnstr(self, y, x, text, n, attr=0):
+        for i, char in enumerate(text[:min(n, COLS - x)]):
+            self.screen[y][x + i] = char
+
+    def clear(self):
+        self.screen = [[" "] * COLS for _ in range(LINES)]
+
+    def getmaxyx(self):
+        return LINES, COLS
+
+    def timeout(self, delay):
+        self.delay = delay
+
+    def move(self, y, x):
+        pass
+
+    def keypad(self, flag):
+        pass
+
+    def pointers(self):
+        return [y for y, line in enumerate(self.screen) if line[0] == ">"]
+
+    def results(self):
+        lines = ("".join(line[2:]).strip() for line in self.screen[2:])
+        return [line for line in lines if line]
+
+
+class FakeZettelkasten:
+    def __init__(self, titles):
+        self.rows = [(title, zk_id) for zk_id, title in enumerate(titles)]
+        self.queries = 0
+
+    def list_notes(self, title, tags=None, links=None):
+        self.queries += 1
+        needle = title[0].strip("%").lower()
+        return [row for row in self.rows if needle in row[0].lower()]
+
+
+def run_selector(keys, zk):
+    """
+    Run the selector on a fake window, reading the keys given.
+
+    :return: the window.
+    """
+    window = FakeWindow(keys)
+    with patch.multiple(curses,
+                        initscr=lambda: window,
+                        ungetch=window.ungetch,
+                        start_color=lambda: None,
+                        init_pair=lambda *args: None,
+                        color_pair=lambda n: 0,
+                        curs_set=lambda flag: None,
+                        set_escdelay=lambda delay: None),\
+            patch.object(curses, "LINES", LINES, create=True),\
+            patch.object(curses, "COLS", COLS, create=True):
+        Interactive(zk)._main()
+
+    return window
+
+
+class TestInteractive(unittest.TestCase):
+    def run_keys(self, keys):
+        return run_selector(keys, FakeZettelkasten(f"note {i}" for i in range(5)))
+
+    def test_pointer_moves(self):
+        window = self.run_keys([curses.KEY_DOWN, curses.KEY_DOWN])
+        self.assertEqual(window.pointers(), [4])
+
+    def test_edit_with_same_results(self):
+        """
+        Editing resets the pointer to the first result, even when
+        the results don't change: the trailing space is stripped.
+        """
+        window = self.run_keys([curses.KEY_DOWN] * 3 + [ord(" "), curses.ERR])
+        self.assertEqual(window.pointers(), [2])
+
+    def test_edit_burst_with_same_results(self):
+        """
+        Same as above, typing and deleting a character at once.
+        """
+        window = self.run_keys([curses.KEY_DOWN] * 3
+                               + [ord("x"), curses.KEY_BACKSPACE, curses.ERR])
+        self.assertEqual(window.pointers(), [2])
+
+    def test_move_after_edit_with_same_results(self):
+        window = self.run_keys([curses.KEY_DOWN] * 3 + [ord(" "), curses.KEY_DOWN])
+        self.assertEqual(window.pointers(), [3])
+
+    def test_wait_for_keys(self):
+        """
+        Keys are waited for without a timeout, unless a query is pending
+        """
+        window = self.run_keys([ord("n"), curses.ERR, curses.KEY_DOWN])
+        self.assertEqual(window.waits, [-1, DEBOUNCE_DELAY, -1, -1])
+
+
+class TestQuery(unittest.TestCase):
+    def setUp(self):
+        self.zk = FakeZettelkasten(["alpha", "beta", "gamma", "delta", "kappa"])
+
+    def run_keys(self, keys):
+        return run_selector(keys, self.zk)
+
+    def test_narrow_results(self):
+        """
+        Extending the text narrows the previous results without querying
+        """
+        window = self.run_keys([ord("a"), curses.ERR, ord("l"), curses.ERR])
+        self.assertEqual(window.results(), ["alpha"])
+        self.assertEqual(self.zk.queries, 1)
+
+    def test_cached_results(self):
+        """
+        Backspacing reuses the results of the shorter text
+        """
+        window = self.run_keys([ord("e"), curses.ERR, ord("l"), curses.ERR,
+                                curses.KEY_BACKSPACE, curses.ERR])
+        self.assertEqual(window.results(), ["beta", "delta"])
+        self.assertEqual(self.zk.queries, 1)
+
+    def test_local_filter_limit(self):
+        """
+        Too many previous results are queried again instead
+        """
+        with patch.object(interactive_selection, "LOCAL_FILTER_LIMIT", 3):
+            window = self.run_keys([ord("a"), curses.ERR, ord("l"), curses.ERR])
+        self.assertEqual(window.results(), ["alpha"])
+        self.assertEqual(self.zk.queries, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import sqlite3
+import unittest
+from itertools import product
+
+from notepy.parser.like import compile_like, LikeKind
+
+
+PATTERNS = ["", "%", "%%", "_", "a", "ab", "%ab%", "ab%", "%ab", "a%b", "%a%b%",
+            "a%b%", "%a%b", "a_b", "%a_%", "_%", "%_", "Ab", "%B%", "%É%", "%é%",
+            "%.*%", "%a%a%", "aa%a", "a%aa"]
+TEXTS = ["", "a", "ab", "AB", "aab", "ba", "abab", "xaby", "a b", "é", "É",
+         ".*", "a\nb", "aa", "aaa", "a.b"]
+
+
+class TestLike(unittest.TestCase):
+    def test_same_as_sqlite(self):
+        """
+        Matchers agree with SQLite's LIKE
+        """
+        with sqlite3.connect(":memory:") as conn:
+            for pattern, text in product(PATTERNS, TEXTS):
+                with self.subTest(pattern=pattern, text=text):
+                    expected = conn.execute("SELECT ? LIKE ?", (text, pattern)).fetchone()[0]
+                    self.assertEqual(compile_like(pattern).match(text), bool(expected))
+
+    def test_kinds(self):
+        self.assertEqual(compile_like("ab").kind, LikeKind.EQUAL)
+        self.assertEqual(compile_like("ab%").kind, LikeKind.STARTS_WITH)
+        self.assertEqual(compile_like("%ab").kind, LikeKind.ENDS_WITH)
+        self.assertEqual(compile_like("%ab%").kind, LikeKind.CONTAINS)
+        self.assertEqual(compile_like("%a%b%").kind, LikeKind.MULTI_CONTAINS)
+        self.assertEqual(compile_like("a_b").kind, LikeKind.GENERIC)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,8 @@
 import unittest
 from datetime import datetime
-from notepy.notes import Note
+from tempfile import TemporaryDirectory
+from notepy.zettelkasten.notes import Note, NoteException, sluggify
+from tests.support import write_notes
 
 
 class TestNote(unittest.TestCase):
@@ -8,23 +10,74 @@ class TestNote(unittest.TestCase):
         self.title = "The quick brown fox jumps over the lazy dog"
         self.author = "Anonymous"
         self.date = "2023-10-19T19:30:01"
-        self.zk_id = '3e804e0062ecdba15ee1dd655385c8b8'
-        self.tags = "#test,#unittest,#zettelkasten"
+        self.last = "2023-10-20T08:00:00"
+        self.zk_id = 20231019193001
+        self.tags = "#test #unittest #zettelkasten"
         self.metadata = {'title': self.title,
                          'author': self.author,
-                         'date': self.date,
+                         'date': datetime.fromisoformat(self.date),
+                         'last': datetime.fromisoformat(self.last),
                          'zk_id': self.zk_id,
-                         'tags': self.tags}
-        self.frontmatter = f"---\ntitle: {self.title}\nauthor: {self.author}\ndate: {self.date}\nzk_id: {self.zk_id}\ntags: {self.tags}\n---"
+                         'tags': self.tags.split()}
+        self.frontmatter = (f"---\ntitle: {self.title}\nauthor: {self.author}\n"
+                            f"date: {self.date}\nlast: {self.last}\n"
+                            f"zk_id: {self.zk_id}\ntags: {self.tags}\n---")
 
     def test_generate_frontmatter(self):
         """
         Test whether the generated frontmatter is
         correct given a set metadata
         """
-        generated_frontmatter = Note._generate_frontmatter(self.metadata)
+        note = Note(**self.metadata, links=[], body="")
+        generated_frontmatter = note.generate_frontmatter()
         self.assertEqual(generated_frontmatter, self.frontmatter)
 
+    def test_generate_id(self):
+        date = datetime.fromisoformat(self.date)
+        self.assertEqual(Note._generate_id(date), int(date.strftime("%Y%m%d%H%M%S")))
+
+    def test_sluggify(self):
+        self.assertEqual(sluggify("The quick, brown fox: jumps-over!"),
+                         "the-quick-brown-fox-jumps-over")
+
+
+class TestReadNotes(unittest.TestCase):
+    def setUp(self):
+        tmp = TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = tmp.name
+        self.parsing_obj = ["title", "author", "date", "last", "zk_id", "tags"]
+
+    def check_read_many(self, count):
+        paths = write_notes(self.directory, count)
+        expected = [Note.read(path, self.parsing_obj) for path in paths]
+        self.assertEqual(Note.read_many(paths, self.parsing_obj), expected)
+        self.assertEqual([note.title for note in expected],
+                         [f"Note {i}" for i in range(count)])
+
+    def test_read_many(self):
+        self.check_read_many(3)
+
+    def test_read_many_in_parallel(self):
+        """
+        Enough notes are parsed in worker processes, with the same result
+        """
+        self.check_read_many(40)
+
+    def test_read_missing(self):
+        with self.assertRaises(NoteException):
+            Note.read(f"{self.directory}/missing.md", self.parsing_obj)
+
+    def test_read_many_missing(self):
+        """
+        Missing notes are reported the same way, in parallel or not
+        """
+        for count in (3, 40):
+            with self.subTest(count=count):
+                paths = [*write_notes(self.directory, count), f"{self.directory}/missing.md"]
+                with self.assertRaises(NoteException):
+                    Note.read_many(paths, self.parsing_obj)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from notepy.parser import HeaderParser, BodyParser, NoteParser, parse_paths
+from tests.support import write_notes
+
+
+class TestParsePaths(unittest.TestCase):
+    def setUp(self):
+        tmp = TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.paths = write_notes(tmp.name, 20)
+        self.note_parser = NoteParser(HeaderParser(["title", "author", "date", "last",
+                                                    "zk_id", "tags"]),
+                                      BodyParser())
+
+    def test_same_as_sequential(self):
+        """
+        Notes parsed in worker processes come back
+        in order, parsed as in the current process
+        """
+        expected = [self.note_parser.parse(path=path)[0] for path in self.paths]
+        parsed = list(parse_paths(self.paths, self.note_parser, processes=2, chunksize=3))
+        self.assertEqual(parsed, expected)
+        self.assertEqual([note['frontmatter']['title'] for note in parsed],
+                         [f"Note {i}" for i in range(20)])
+        self.assertEqual(parsed[3]['links'], {"note-4", "note-2"})
+
+    def test_missing_note(self):
+        with self.assertRaises(FileNotFoundError):
+            list(parse_paths([*self.paths, Path("missing.md")], self.note_parser, processes=2))
+
+
+if __name__ == "__main__":
+    unittest.main()
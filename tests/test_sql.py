@@ -0,0 +1,223 @@
+import pickle
+import sqlite3
+import unittest
+from datetime import datetime
+from multiprocessing import Pool
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from notepy.zettelkasten.notes import Note
+from notepy.zettelkasten.sql import DBManager
+
+
+def make_note(zk_id, title, tags=(), links=(), author="Anonymous"):
+    date = datetime(2023, 10, 19, 19, 30, 1)
+    return Note(title=title,
+                author=author,
+                date=date,
+                last=date,
+                zk_id=zk_id,
+                tags=list(tags),
+                links=list(links),
+                body=f"# {title}")
+
+
+def _list_titles(dbmanager):
+    return [row[0] for row in dbmanager.list_notes(show=['title'])]
+
+
+def _list_titles_filtered(dbmanager, title):
+    return [row[0] for row in dbmanager.list_notes(title=title, show=['title'])]
+
+
+class DBManagerTestCase(unittest.TestCase):
+    def setUp(self):
+        tmp = TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.index = Path(tmp.name) / ".index.db"
+        self.dbmanager = DBManager(self.index)
+        self.addCleanup(self.dbmanager.close)
+        self.dbmanager.create_tables()
+
+    def query(self, query, *args):
+        with sqlite3.connect(self.index) as conn:
+            return conn.execute(query, args).fetchall()
+
+
+class TestConnection(DBManagerTestCase):
+    def test_connection_is_kept(self):
+        conn = self.dbmanager._conn
+        self.dbmanager.add_to_index(make_note(1, "one"))
+        self.assertIs(self.dbmanager._conn, conn)
+
+    def test_close(self):
+        self.dbmanager.add_to_index(make_note(1, "one"))
+        conn = self.dbmanager._conn
+        self.dbmanager.close()
+        with self.assertRaises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+        # closing twice is fine, and the next use reopens it
+        self.dbmanager.close()
+        self.assertEqual(_list_titles(self.dbmanager), ["one"])
+
+    def test_context_manager(self):
+        with DBManager(self.index) as dbmanager:
+            dbmanager.add_to_index(make_note(1, "one"))
+            conn = dbmanager._conn
+        with self.assertRaises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+        self.assertEqual(self.query("SELECT title FROM zettelkasten"), [("one",)])
+
+    def test_pickle(self):
+        """
+        The connection is not pickled, the copy opens its own
+        """
+        self.dbmanager.add_to_index(make_note(1, "one"))
+        copy = pickle.loads(pickle.dumps(self.dbmanager))
+        self.assertNotIn("_conn", copy.__dict__)
+        self.assertEqual(_list_titles(copy), ["one"])
+        self.assertIsNot(copy._conn, self.dbmanager._conn)
+        copy.close()
+
+    def test_pool(self):
+        self.dbmanager.add_to_index(make_note(1, "one"))
+        with Pool(2) as pool:
+            results = pool.map(_list_titles, [self.dbmanager] * 2)
+        self.assertEqual(results, [["one"], ["one"]])
+
+
+class TestListNotes(DBManagerTestCase):
+    def setUp(self):
+        super().setUp()
+        # indexed out of id order, as reindexing does
+        self.dbmanager.add_many_to_index([
+            make_note(3, "gamma", tags=["#b"], links=["alpha"], author="Carol"),
+            make_note(1, "alpha", tags=["#a", "#b"], links=["beta"], author="Bob"),
+            make_note(2, "beta", links=["alpha"], author="Alice"),
+            make_note(4, "delta", tags=["#a"], author="Bob"),
+        ])
+
+    def titles(self, **kwargs):
+        return [row[0] for row in self.dbmanager.list_notes(show=['title'], **kwargs)]
+
+    def test_unsorted_ids(self):
+        """
+        Listing ids without sorting lists them by id
+        """
+        self.assertEqual(self.dbmanager.list_notes(),
+                         [("alpha", 1), ("beta", 2), ("gamma", 3), ("delta", 4)])
+        self.assertEqual(self.dbmanager.list_notes(tag=["#a"]),
+                         [("alpha", 1), ("delta", 4)])
+
+    def test_unsorted_without_ids(self):
+        """
+        Otherwise the notes come in the order they were indexed
+        """
+        self.assertEqual(self.dbmanager.list_notes(show=['author']),
+                         [("Carol",), ("Bob",), ("Alice",)])
+        self.assertEqual(self.titles(), ["gamma", "alpha", "beta", "delta"])
+
+    def test_sorted(self):
+        self.assertEqual(self.titles(sort_by="title", descending=False),
+                         ["alpha", "beta", "delta", "gamma"])
+
+    def test_tags_and_links(self):
+        self.assertEqual(self.titles(tag=["#a"]), ["alpha", "delta"])
+        self.assertEqual(self.titles(link=["alpha"]), ["gamma", "beta"])
+        self.assertEqual(self.titles(tag=["#b"], link=["alpha"]), ["gamma"])
+
+    def test_several_columns(self):
+        """
+        Patterns of a column are alternatives, columns must all match
+        """
+        self.assertEqual(self.titles(tag=["#a", "#b"], link=["alpha"]), ["gamma"])
+        self.assertEqual(self.titles(title=["beta", "alpha"], author=["Bob"]), ["alpha"])
+        self.assertEqual(sorted(self.titles(title=["%a"], tag=["#a", "#b"],
+                                            link=["beta", "alpha"])),
+                         ["alpha", "gamma"])
+        rows = self.dbmanager.list_notes(show=['title', 'tag'],
+                                         tag=["#a", "#b"], link=["alpha"])
+        self.assertEqual(rows, [("gamma", "#b")])
+
+    def test_negated_tag(self):
+        """
+        A note matches a negated tag when it has another tag.
+        Notes without tags match no tag filter.
+        """
+        self.assertEqual(self.titles(tag=["!#a"]), ["gamma", "alpha"])
+
+    def test_shown_tags(self):
+        """
+        Showing tags joins them, and shows the matching ones
+        """
+        rows = self.dbmanager.list_notes(show=['title', 'tag'], tag=["#a"])
+        self.assertEqual(sorted(rows), [("alpha", "#a"), ("delta", "#a")])
+
+
+class TestTitles(DBManagerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dbmanager.add_many_to_index([make_note(1, "The Quick fox"),
+                                          make_note(2, "A lazy dog"),
+                                          make_note(3, "quicksand")])
+
+    def titles(self, *patterns):
+        return sorted(_list_titles_filtered(self.dbmanager, list(patterns)))
+
+    def check_titles(self):
+        self.assertEqual(self.titles("%quick%"), ["The Quick fox", "quicksand"])
+        self.assertEqual(self.titles("%o%"), ["A lazy dog", "The Quick fox"])
+        self.assertEqual(self.titles("quick%"), ["quicksand"])
+        self.assertEqual(self.titles("%q_ick%"), ["The Quick fox", "quicksand"])
+        self.assertEqual(self.titles("!%quick%"), ["A lazy dog"])
+
+    def test_titles_index(self):
+        self.assertTrue(self.dbmanager._has_titles_index())
+        self.check_titles()
+
+    def test_without_titles_index(self):
+        """
+        Indexes created before the titles index still filter titles
+        """
+        self.query("DROP TABLE titles_fts")
+        with DBManager(self.index) as dbmanager:
+            self.assertFalse(dbmanager._has_titles_index())
+            self.dbmanager = dbmanager
+            self.check_titles()
+
+    def test_titles_index_follows_changes(self):
+        self.dbmanager.update_note_to_index(make_note(3, "Slow sand"))
+        self.dbmanager.delete_from_index(1)
+        self.assertEqual(self.titles("%quick%"), [])
+        self.assertEqual(self.titles("%sand%"), ["Slow sand"])
+        self.assertEqual(self.query("SELECT count(*) FROM titles_fts WHERE title LIKE '%quick%'"),
+                         [(0,)])
+
+
+class TestForeignKeys(DBManagerTestCase):
+    def test_delete_cascades(self):
+        """
+        Deleting a note deletes its tags and links
+        """
+        self.dbmanager.add_to_index(make_note(1, "one", tags=["#a"], links=["two"]))
+        self.dbmanager.add_to_index(make_note(2, "two", tags=["#a"], links=["one"]))
+        self.dbmanager.delete_from_index(1)
+        self.assertEqual(self.query("SELECT tag, zk_id FROM tags"), [("#a", 2)])
+        self.assertEqual(self.query("SELECT link, zk_id FROM links"), [("one", 2)])
+
+    def test_orphans_rejected(self):
+        with self.assertRaises(sqlite3.IntegrityError):
+            with self.dbmanager._conn as conn:
+                conn.execute("INSERT INTO tags VALUES (?, ?)", ("#a", 1))
+
+    def test_drop_tables(self):
+        self.dbmanager.add_to_index(make_note(1, "one", tags=["#a"], links=["two"]))
+        self.dbmanager.drop_tables()
+        self.assertEqual(self.query("SELECT name FROM sqlite_master WHERE type = 'table'"), [])
+        self.dbmanager.create_tables()
+        self.dbmanager.add_to_index(make_note(1, "one", tags=["#a"], links=["two"]))
+        self.assertEqual(_list_titles(self.dbmanager), ["one"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import asyncio
+import io
+import os
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+from notepy import utils
+from notepy.utils import expanduser, spinner
+
+
+class TestSpinner(unittest.TestCase):
+    def run_spinner(self, func, *args, **kwargs):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            func(*args, **kwargs)
+        return output.getvalue()
+
+    def test_result(self):
+        """
+        The result of the operation goes in the epilogue
+        """
+        @spinner("Working", "Done: {}", format=True)
+        def add(a, b):
+            return a + b
+
+        self.assertIn("Done: 3\n", self.run_spinner(add, 1, b=2))
+
+    def test_exception(self):
+        @spinner("Working", "Done")
+        def fail():
+            raise ValueError("failed")
+
+        output = self.run_spinner(fail)
+        self.assertIn("failed\n", output)
+        self.assertNotIn("Done", output)
+
+    def test_running_loop(self):
+        """
+        Spinners also run from inside an event loop
+        """
+        @spinner("Working", "Done: {}", format=True)
+        def answer():
+            return 42
+
+        async def main():
+            return self.run_spinner(answer)
+
+        self.assertIn("Done: 42\n", asyncio.run(main()))
+
+
+class TestExpanduser(unittest.TestCase):
+    def test_same_as_os(self):
+        """
+        Paths are expanded as by os.path.expanduser, whatever the home
+        """
+        for home in ["/home/user", "/home/user/", "/", "//"]:
+            with patch.dict(os.environ, {"HOME": home}),\
+                    patch.object(utils, "_HOME", utils._home()):
+                for path in ["~", "~/", "~/x", "~//x", "x/~", "", "/x"]:
+                    with self.subTest(home=home, path=path):
+                        self.assertEqual(expanduser(path), os.path.expanduser(path))
+
+
+if __name__ == "__main__":
+    unittest.main()